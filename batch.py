@@ -0,0 +1,102 @@
+import asyncio
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from job_store import job_store
+from src.events import event_bus, TERMINAL_STATUSES
+from src.pipeline.rfp_processor import render_batch_workbook
+from src.pipeline.utils import cleanup_temp_files
+
+load_dotenv()
+
+
+class BatchCoordinator:
+    """Tender packages: one parent job over a child job per PDF, consolidated into one workbook.
+
+    Children are ordinary jobs, queued in the batch's own fairness group so
+    a 40-PDF package shares the workers with single uploads instead of
+    holding them all. A child keeps its extracted sections after finishing;
+    whichever worker sees the last child finish claims the parent and
+    stacks every document's sections, each under a banner naming its PDF,
+    into {batch_id}.xlsx. The batch fails only when no document succeeded.
+    """
+
+    def __init__(self, results_dir: str = None):
+        self.results_dir = Path(results_dir or os.getenv("RESULTS_DIR", "/home/site/wwwroot/results"))
+
+    def create(self, batch_id: str, filename: str, children: list, **fields):
+        """Record the parent job; children is [(job_id, filename)] in upload order"""
+        job_store.create_job(batch_id, filename, status="processing", kind="batch",
+                             children=[job_id for job_id, _ in children],
+                             documents={job_id: name for job_id, name in children},
+                             consolidating=False, **fields)
+
+    def documents(self, batch: dict) -> list:
+        """Status of each document of the batch, for /status"""
+        documents = []
+        for job_id in batch.get("children", []):
+            child = job_store.get_job(job_id) or {"status": "failed", "error": "Job record missing"}
+            documents.append({"job_id": job_id, "filename": batch["documents"].get(job_id),
+                              "status": child["status"], "error": child.get("error")})
+        return documents
+
+    async def child_finished(self, batch_id: str, job_id: str, status: str, owner: str):
+        """Tell the batch's subscribers, and consolidate if this was the last document"""
+        event_bus.publish(batch_id, "document", {"job_id": job_id, "status": status})
+        batch = await asyncio.to_thread(job_store.get_job, batch_id)
+        if batch and batch["status"] not in TERMINAL_STATUSES:
+            await self.finish(batch, owner)
+
+    async def finish(self, batch: dict, owner: str, takeover: bool = False) -> bool:
+        """Consolidate the batch once every child is done; returns whether this call did it.
+
+        Only the worker that flips the batch's consolidating flag proceeds.
+        takeover is for a batch claimed by job recovery, whose previous
+        owner may have died mid-consolidation with the flag already set.
+        """
+        documents = await asyncio.to_thread(self.documents, batch)
+        if any(document["status"] not in TERMINAL_STATUSES for document in documents):
+            return False
+        expected = {"consolidating": batch.get("consolidating", False) if takeover else False}
+        claimed = await asyncio.to_thread(job_store.update_job_if, batch["id"], expected,
+                                          consolidating=True, owner=owner)
+        if not claimed:
+            return False
+        await self._consolidate(batch["id"], documents)
+        return True
+
+    async def _consolidate(self, batch_id: str, documents: list):
+        completed = [document for document in documents if document["status"] == "completed"]
+        failed = [{"job_id": document["job_id"], "filename": document["filename"], "error": document["error"]}
+                  for document in documents if document["status"] != "completed"]
+        if not completed:
+            await self._set_status(batch_id, "failed", error="No document in the batch could be processed",
+                                   failed_documents=failed)
+            return
+        try:
+            self.results_dir.mkdir(parents=True, exist_ok=True)
+            result_path = self.results_dir / f"{batch_id}.xlsx"
+            await render_batch_workbook(
+                [(document["filename"], Path("output") / document["job_id"]) for document in completed],
+                result_path
+            )
+        except Exception as e:
+            await self._set_status(batch_id, "failed", error=str(e), failed_documents=failed)
+            return
+        for document in completed:
+            await asyncio.to_thread(cleanup_temp_files, Path("output") / document["job_id"])
+        await self._set_status(batch_id, "completed", {"download_url": f"/download/{batch_id}"},
+                               result_file=str(result_path), failed_documents=failed)
+
+    async def _set_status(self, batch_id: str, status: str, event: dict = None, **fields):
+        # Every batch status set here is final
+        await asyncio.to_thread(job_store.finish_job, batch_id, status, **fields)
+        event = {"failed_documents": len(fields.get("failed_documents", [])), **(event or {})}
+        if fields.get("error"):
+            event["error"] = fields["error"]
+        event_bus.publish(batch_id, "status", {"status": status, **event})
+
+
+batch_coordinator = BatchCoordinator()
@@ -6,4 +6,12 @@ workers = 1
 timeout = 2400  # 40 minutes
 keepalive = 300
 max_requests = 1000
-preload_app = True
\ No newline at end of file
+preload_app = True
+
+
+def post_worker_init(worker):
+    # Warm the Docling converter pool once per worker; done after fork so
+    # model thread pools are not shared with the master process
+    if os.environ.get("DOCLING_WARM_START", "false").lower() == "true":
+        from main import get_processor
+        get_processor().warm_up()
@@ -1,43 +1,243 @@
+import asyncio
 import json
 import os
+import sqlite3
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
 class JobStore:
-    def __init__(self):
-        self.jobs_file = "/home/site/wwwroot/jobs.json"
-        self.jobs = self._load_jobs()
-    
-    def _load_jobs(self):
-        if os.path.exists(self.jobs_file):
-            with open(self.jobs_file, 'r') as f:
-                return json.load(f)
-        return {}
-    
-    def _save_jobs(self):
-        with open(self.jobs_file, 'w') as f:
-            json.dump(self.jobs, f)
-    
-    def create_job(self, job_id, filename):
-        self.jobs[job_id] = {
+    """Job records in SQLite (WAL mode), shared safely by every gunicorn worker.
+
+    status and created_at are indexed columns; the full record is kept as
+    JSON so new job fields need no schema change.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv("JOB_STORE_DB", "/home/site/wwwroot/jobs.db")
+        self.legacy_jobs_file = "/home/site/wwwroot/jobs.json"
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self._init_schema()
+        self._migrate_legacy_jobs()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        # preload_app imports this module in the gunicorn master: a connection must not cross fork()
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init_schema(self):
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS workers (
+                owner TEXT PRIMARY KEY,
+                seen_at REAL NOT NULL
+            )
+        """)
+
+    def _migrate_legacy_jobs(self):
+        """Import jobs.json once, then set it aside"""
+        legacy = Path(self.legacy_jobs_file)
+        if not legacy.exists():
+            return
+        try:
+            with open(legacy, 'r') as f:
+                jobs = json.load(f)
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                    [(job_id, job.get("status", "unknown"), job.get("created_at", ""), json.dumps(job))
+                     for job_id, job in jobs.items()]
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            legacy.rename(legacy.with_suffix(".json.migrated"))
+            print(f"Migrated {len(jobs)} jobs from {legacy} to {self.db_path}")
+        except (OSError, ValueError) as e:
+            # Another worker may have migrated it already
+            print(f"Skipping jobs.json migration: {e}")
+
+    def create_job(self, job_id, filename, status="processing", **fields):
+        job = {
             "id": job_id,
             "filename": filename,
-            "status": "processing",
+            "status": status,
             "created_at": datetime.now().isoformat(),
             "result_file": None,
-            "error": None
+            "error": None,
+            **fields
         }
-        self._save_jobs()
-    
+        self._connect().execute(
+            "INSERT OR REPLACE INTO jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+            (job_id, job["status"], job["created_at"], json.dumps(job))
+        )
+
+    def _modify(self, job_id, change):
+        """Apply change(job) -> bool to the stored record in one transaction; returns the record if it changed"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            job = json.loads(row[0]) if row else None
+            changed = job is not None and change(job)
+            if changed:
+                conn.execute("UPDATE jobs SET status = ?, data = ? WHERE id = ?",
+                             (job["status"], json.dumps(job), job_id))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return job if changed else None
+
     def update_job(self, job_id, **kwargs):
-        if job_id in self.jobs:
-            self.jobs[job_id].update(kwargs)
-            self._save_jobs()
-    
+        self._modify(job_id, lambda job: job.update(kwargs) or True)
+
+    def update_job_if(self, job_id, expected, **kwargs):
+        """update_job only if every field in expected still has that value; returns whether it did.
+
+        Lets one of several workers claim a step, such as consolidating a
+        batch, that must run once.
+        """
+        def change(job):
+            if any(job.get(key) != value for key, value in expected.items()):
+                return False
+            job.update(kwargs)
+            return True
+        return self._modify(job_id, change) is not None
+
+    def finish_job(self, job_id, status, **fields):
+        """Set a final status, clearing what only applies while a job runs; returns the record.
+
+        A failed job would otherwise keep the ETA of its last progress
+        snapshot, and a batch its consolidation claim.
+        """
+        def change(job):
+            job.update(fields, status=status)
+            if job.get("progress"):
+                job["progress"] = {**job["progress"], "eta_seconds": None}
+            if job.get("consolidating"):
+                job["consolidating"] = False
+            return True
+        return self._modify(job_id, change)
+
     def get_job(self, job_id):
-        return self.jobs.get(job_id)
-    
+        row = self._connect().execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
     def get_active_jobs(self):
-        return [job for job in self.jobs.values() if job['status'] == 'processing']
+        rows = self._connect().execute(
+            "SELECT data FROM jobs WHERE status = 'processing' ORDER BY created_at"
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def recent_jobs(self, status, limit=50):
+        """Newest jobs with the given status"""
+        rows = self._connect().execute(
+            "SELECT data FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def iter_finished_jobs(self, created_before: str = None):
+        """Jobs that are no longer queued or processing, oldest first"""
+        query = "SELECT data FROM jobs WHERE status NOT IN ('queued', 'processing')"
+        params = ()
+        if created_before:
+            query += " AND created_at < ?"
+            params = (created_before,)
+        for row in self._connect().execute(query + " ORDER BY created_at", params):
+            yield json.loads(row[0])
+
+    def delete_jobs(self, job_ids):
+        self._connect().executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+
+    def heartbeat(self, owner):
+        self._connect().execute("INSERT OR REPLACE INTO workers (owner, seen_at) VALUES (?, ?)",
+                                (owner, time.time()))
+
+    def remove_worker(self, owner):
+        self._connect().execute("DELETE FROM workers WHERE owner = ?", (owner,))
+
+    def claim_orphaned_jobs(self, owner, stale_after):
+        """Take over queued/processing jobs whose owner has not heartbeated within stale_after seconds.
+
+        Claimed jobs are stamped with the new owner and their resume count is
+        bumped in the same transaction, so two live workers never claim the
+        same job.
+        """
+        conn = self._connect()
+        cutoff = time.time() - stale_after
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM workers WHERE seen_at < ?", (cutoff,))
+            live = {row[0] for row in conn.execute("SELECT owner FROM workers")}
+            claimed = []
+            rows = conn.execute(
+                "SELECT id, data FROM jobs WHERE status IN ('queued', 'processing') ORDER BY created_at"
+            ).fetchall()
+            for job_id, data in rows:
+                job = json.loads(data)
+                if job.get("owner") in live:
+                    continue
+                job["owner"] = owner
+                job["id"] = job_id
+                job["resumes"] = job.get("resumes", 0) + 1
+                conn.execute("UPDATE jobs SET data = ? WHERE id = ?", (json.dumps(job), job_id))
+                claimed.append(job)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return claimed
+
+
+class JobUpdates:
+    """Writes one job's frequent updates (progress ticks, published sections) off the event loop.
+
+    put() may be called from synchronous callbacks on the loop; fields
+    queued while a write is in flight are merged into the next one, so
+    writes stay in order and a burst of ticks costs one transaction.
+    """
+
+    def __init__(self, store: JobStore, job_id: str):
+        self.store = store
+        self.job_id = job_id
+        self._pending = {}
+        self._writer = None
+
+    def put(self, **fields):
+        self._pending.update(fields)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        while self._pending:
+            fields, self._pending = self._pending, {}
+            await asyncio.to_thread(self.store.update_job, self.job_id, **fields)
+
+    async def drain(self):
+        """Wait until everything put so far is written, e.g. before the job's final status"""
+        if self._writer is not None:
+            await self._writer
 
-job_store = JobStore()
\ No newline at end of file
+job_store = JobStore()
@@ -1,21 +1,33 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header, Request
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from typing import List
 import os
 import uuid
+import zipfile
 from datetime import datetime
 import asyncio
+import hashlib
+import hmac
+import time
 from pathlib import Path
-import shutil
+import aiofiles
 import tempfile
 import pandas as pd
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import Font, PatternFill, Border, Alignment, Side
-from openpyxl.utils import get_column_letter
  
-from src.pipeline.rfp_processor import RFPProcessor
+from src.pipeline.rfp_processor import RFPProcessor, SECTIONS
 from src.pipeline.utils import create_folder_structure, cleanup_temp_files
-from job_store import job_store
+from src.pipeline.parse_cache import parse_cache
+from src.pipeline.job_queue import job_queue, QueueFull, QueueClosed
+from src.pipeline.stages import stages
+from src.pipeline.progress import stage_timings
+from src.llm_extractor.result_cache import extraction_cache
+from src import metrics
+from src.events import event_bus, job_context, format_sse, TERMINAL_STATUSES
+from job_store import job_store, JobUpdates
+from retention import retention_sweeper
+from recovery import job_recovery
+from batch import batch_coordinator
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -38,6 +50,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
  
+# Result workbooks; pruned by the retention sweeper
+RESULTS_DIR = os.getenv("RESULTS_DIR", "/home/site/wwwroot/results")
+
+# Uploaded PDFs, read in place by the pipeline and kept until their job finishes
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/home/site/wwwroot/uploads")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+# Allowance for multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Tender packages: PDFs per batch, and the size of the whole request (PDFs and zip archives)
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", 40))
+MAX_BATCH_UPLOAD_BYTES = int(os.getenv("MAX_BATCH_UPLOAD_BYTES", 1024 * 1024 * 1024))
+
+# Idle SSE streams get a keepalive comment (and a job store check) this often
+EVENTS_KEEPALIVE_SECONDS = 15
+
+# Progress reaches SSE subscribers on every tick but the job store at most this often
+PROGRESS_SAVE_INTERVAL_SECONDS = 1.0
+ 
 # Initialize the RFP processor (lazy loading)
 processor = None
  
@@ -47,104 +79,386 @@ def get_processor():
         processor = RFPProcessor()
     return processor
  
+@app.on_event("startup")
+async def start_background_workers():
+    # ETAs start from the stage times of recently completed jobs
+    stage_timings.seed(job_store.recent_jobs("completed", stage_timings.window))
+    job_queue.start(process_background)
+    job_recovery.start()
+    asyncio.create_task(job_recovery.run_forever())
+    asyncio.create_task(retention_sweeper.run_forever())
+ 
+@app.on_event("shutdown")
+async def stop_background_workers():
+    # In-flight jobs stay "processing" and are resumed from their checkpoints
+    await job_queue.stop()
+    job_recovery.stop()
+    # Spawned Docling shard processes would otherwise outlive the app
+    if processor is not None:
+        processor.sharded_parser.shutdown()
+ 
+def queue_rejection(error):
+    """429 when the queue is full, 503 when no workers are accepting jobs"""
+    status_code = 429 if isinstance(error, QueueFull) else 503
+    return HTTPException(status_code=status_code, detail=str(error),
+                         headers={"Retry-After": str(error.retry_after)})
+ 
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Refuse oversized uploads from their Content-Length before the body is read"""
+    length = request.headers.get("content-length")
+    limit = MAX_BATCH_UPLOAD_BYTES if request.url.path.startswith("/process-batch") else MAX_UPLOAD_BYTES
+    if request.method == "POST" and length and length.isdigit() \
+            and int(length) > limit + MULTIPART_OVERHEAD_BYTES:
+        return JSONResponse(status_code=413, content={"detail": f"Upload exceeds {limit} bytes"})
+    return await call_next(request)
+ 
+async def save_upload(file: UploadFile, path: str, limit: int = MAX_UPLOAD_BYTES):
+    """Stream an upload to path in chunks, hashing it on the way; returns (sha256, size).
+
+    Raises 413 as soon as the upload grows past limit (chunked requests
+    carry no Content-Length). The file is written under a .partial name
+    and only renamed to path once complete.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    partial = f"{path}.partial"
+    try:
+        async with aiofiles.open(partial, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {limit} bytes")
+                digest.update(chunk)
+                await out.write(chunk)
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return digest.hexdigest(), size
+ 
 @app.post("/process-rfp/")
 async def process_rfp(file: UploadFile = File(...)):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    
+    # Refuse before reading the upload when the queue cannot take it
+    try:
+        job_queue.check_admission()
+    except (QueueFull, QueueClosed) as e:
+        raise queue_rejection(e)
    
     job_id = str(uuid.uuid4())
-    job_store.create_job(job_id, file.filename)
     
-    # Save file in persistent location
-    os.makedirs("/home/site/wwwroot/uploads", exist_ok=True)
-    file_path = f"/home/site/wwwroot/uploads/{job_id}.pdf"
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # Save file in persistent location; kept until the job finishes so it can be resumed
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.join(UPLOAD_DIR, f"{job_id}.pdf")
+    with metrics.track_job() as job_metrics, metrics.timed("upload"):
+        sha256, size = await save_upload(file, file_path)
+    await asyncio.to_thread(job_store.create_job, job_id, file.filename, status="queued", owner=job_recovery.owner,
+                            upload_path=file_path, sha256=sha256, size_bytes=size,
+                            metrics=job_metrics.as_dict())
     
-    # Start background task
-    asyncio.create_task(process_background(job_id, file_path, file.filename))
+    try:
+        await job_queue.submit(job_id, file_path, file.filename)
+    except (QueueFull, QueueClosed) as e:
+        await asyncio.to_thread(job_store.delete_jobs, [job_id])
+        os.remove(file_path)
+        raise queue_rejection(e)
     
-    return {"job_id": job_id, "status": "processing"}
+    return {"job_id": job_id, "status": "queued", "queue_position": job_queue.position(job_id)}
 
+def unpack_pdfs(archive_path: str) -> list:
+    """Extract every PDF in a zip archive into UPLOAD_DIR; returns (job_id, filename, path, sha256, size) each.
+
+    Members are streamed and hashed like uploads, and held to the same
+    MAX_UPLOAD_BYTES however well they compress.
+    """
+    documents = []
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                name = Path(member.filename).name
+                if member.is_dir() or not name.lower().endswith(".pdf") or member.filename.startswith("__MACOSX/"):
+                    continue
+                job_id = str(uuid.uuid4())
+                path = os.path.join(UPLOAD_DIR, f"{job_id}.pdf")
+                partial = f"{path}.partial"
+                digest = hashlib.sha256()
+                size = 0
+                try:
+                    with archive.open(member) as source, open(partial, "wb") as out:
+                        while chunk := source.read(UPLOAD_CHUNK_BYTES):
+                            size += len(chunk)
+                            if size > MAX_UPLOAD_BYTES:
+                                raise HTTPException(status_code=413,
+                                                    detail=f"{name} exceeds {MAX_UPLOAD_BYTES} bytes")
+                            digest.update(chunk)
+                            out.write(chunk)
+                    os.replace(partial, path)
+                finally:
+                    if os.path.exists(partial):
+                        os.remove(partial)
+                documents.append((job_id, name, path, digest.hexdigest(), size))
+                if len(documents) > BATCH_MAX_FILES:
+                    raise HTTPException(status_code=400, detail=f"A batch holds at most {BATCH_MAX_FILES} PDFs")
+    except BaseException as e:
+        for _, _, path, _, _ in documents:
+            os.remove(path)
+        if isinstance(e, zipfile.BadZipFile):
+            raise HTTPException(status_code=400, detail=f"Not a valid zip archive: {e}")
+        raise
+    return documents
+ 
+@app.post("/process-batch/")
+async def process_batch(files: List[UploadFile] = File(...), merge: bool = False):
+    """Process a tender package (PDFs and/or zip archives of PDFs) into one consolidated workbook.
+
+    By default each PDF becomes a child job in the batch's own queue
+    group, sharing the parse and extraction caches with every other job,
+    and the batch job completes once all of them have finished. With
+    ?merge=true the package is one job instead: the PDFs are parsed and
+    merged into a single logical RFP (main document first) and each
+    extractor runs once over it. Follow either with /status/{batch_id} or
+    /jobs/{batch_id}/events.
+    """
+    for file in files:
+        if not file.filename.lower().endswith(('.pdf', '.zip')):
+            raise HTTPException(status_code=400, detail="Only PDF files and zip archives of PDFs are supported")
+    
+    # The whole batch is admitted (or refused) as one queue entry
+    try:
+        job_queue.check_admission()
+    except (QueueFull, QueueClosed) as e:
+        raise queue_rejection(e)
+    
+    batch_id = str(uuid.uuid4())
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    documents = []
+    try:
+        with metrics.track_job() as batch_metrics, metrics.timed("upload", "batch"):
+            for file in files:
+                if file.filename.lower().endswith('.zip'):
+                    archive_path = os.path.join(UPLOAD_DIR, f"{batch_id}.zip")
+                    await save_upload(file, archive_path, MAX_BATCH_UPLOAD_BYTES)
+                    try:
+                        documents.extend(await asyncio.to_thread(unpack_pdfs, archive_path))
+                    finally:
+                        os.remove(archive_path)
+                else:
+                    job_id = str(uuid.uuid4())
+                    file_path = os.path.join(UPLOAD_DIR, f"{job_id}.pdf")
+                    sha256, size = await save_upload(file, file_path)
+                    documents.append((job_id, file.filename, file_path, sha256, size))
+                if len(documents) > BATCH_MAX_FILES:
+                    raise HTTPException(status_code=400, detail=f"A batch holds at most {BATCH_MAX_FILES} PDFs")
+        if not documents:
+            raise HTTPException(status_code=400, detail="No PDF files found in the upload")
+    except BaseException:
+        for _, _, path, _, _ in documents:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    
+    filename = Path(files[0].filename).stem if len(files) == 1 else f"Batch_of_{len(documents)}_documents"
+    if merge:
+        uploads = [{"filename": name, "upload_path": path, "sha256": sha256, "size_bytes": size}
+                   for _, name, path, sha256, size in documents]
+        await asyncio.to_thread(job_store.create_job, batch_id, filename, status="queued", kind="merged",
+                                owner=job_recovery.owner, uploads=uploads, metrics=batch_metrics.as_dict())
+        try:
+            await job_queue.submit(batch_id, None, filename, force=True)
+        except QueueClosed as e:
+            raise queue_rejection(e)
+        return {"batch_id": batch_id, "job_id": batch_id, "status": "queued", "mode": "merged",
+                "documents": len(documents), "queue_position": job_queue.position(batch_id)}
+    
+    def create_jobs():
+        batch_coordinator.create(batch_id, filename, [(job_id, name) for job_id, name, _, _, _ in documents],
+                                 owner=job_recovery.owner, metrics=batch_metrics.as_dict())
+        for job_id, name, path, sha256, size in documents:
+            job_store.create_job(job_id, name, status="queued", owner=job_recovery.owner, parent_id=batch_id,
+                                 upload_path=path, sha256=sha256, size_bytes=size)
+    
+    await asyncio.to_thread(create_jobs)
+    
+    try:
+        for job_id, name, path, _, _ in documents:
+            await job_queue.submit(job_id, path, name, force=True, group=batch_id)
+    except QueueClosed as e:
+        # Only raised while shutting down; recovery resumes the batch in another worker
+        raise queue_rejection(e)
+    
+    return {"batch_id": batch_id, "status": "processing", "mode": "separate", "documents": len(documents),
+            "jobs": [{"job_id": job_id, "filename": name} for job_id, name, _, _, _ in documents]}
+ 
 async def process_background(job_id: str, pdf_path: str, filename: str):
+    # Keyed by job so a resumed job finds the checkpoints of its earlier attempt
+    session_folder = Path("output") / job_id
+    job = await asyncio.to_thread(job_store.get_job, job_id) or {}
+    with metrics.track_job(job.get("metrics")) as job_metrics, job_context(job_id):
+        status = await run_job(job_id, job, pdf_path, session_folder)
+    await asyncio.to_thread(job_store.update_job, job_id, metrics=job_metrics.as_dict())
+    metrics.jobs_finished.inc(status=status)
+    if job.get("parent_id"):
+        await batch_coordinator.child_finished(job["parent_id"], job_id, status, job_recovery.owner)
+ 
+async def set_status(job_id: str, status: str, event: dict = None, **fields):
+    """Update a job's status and push it, with event details, to the job's SSE subscribers"""
+    if status in TERMINAL_STATUSES:
+        job = await asyncio.to_thread(job_store.finish_job, job_id, status, **fields)
+        if job and job.get("progress"):
+            # Replaces the countdown subscribers saw last
+            event_bus.publish(job_id, "progress", job["progress"])
+    else:
+        await asyncio.to_thread(job_store.update_job, job_id, status=status, **fields)
+    event_bus.publish(job_id, "status", {"status": status, **(event or {})})
+ 
+async def run_job(job_id: str, job: dict, pdf_path: str, session_folder: Path) -> str:
+    """Run one job through the pipeline; returns its final status"""
+    # A merged package job has several uploads and no pdf_path
+    uploads = job.get("uploads") or [{"upload_path": pdf_path}]
+    # Progress ticks and sections arrive through sync callbacks; written in order off the loop
+    updates = JobUpdates(job_store, job_id)
     try:
-        session_id = str(uuid.uuid4())
+        await set_status(job_id, "processing")
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        session_folder = create_folder_structure(session_id, timestamp)
+        session_folder = create_folder_structure(job_id, timestamp)
         
-        # Copy file to session folder
-        session_pdf = session_folder / "input" / filename
-        shutil.copy2(pdf_path, session_pdf)
+        # Process straight into the result workbook in a persistent location
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        result_path = os.path.join(RESULTS_DIR, f"{job_id}.xlsx")
         
-        # Process
-        proc = get_processor()
-        await proc.process_rfp(session_pdf, session_folder)
+        saved = {"at": 0.0, "stage": None, "stage_seconds": None}
         
-        # Create result file in persistent location
-        os.makedirs("/home/site/wwwroot/results", exist_ok=True)
-        result_path = f"/home/site/wwwroot/results/{job_id}.xlsx"
+        def report_progress(progress: dict):
+            # Stage changes and finished stages (whose times seed ETAs at startup) are always saved
+            now = time.time()
+            if now - saved["at"] >= PROGRESS_SAVE_INTERVAL_SECONDS or progress["stage"] != saved["stage"] \
+                    or progress["stage_seconds"] != saved["stage_seconds"]:
+                updates.put(progress=progress)
+                saved.update(at=now, stage=progress["stage"], stage_seconds=progress["stage_seconds"])
+            event_bus.publish(job_id, "progress", progress)
         
-        base_path = session_folder / "excel"
-        combined_wb = Workbook()
-        combined_wb.remove(combined_wb.active)
+        # Sections become downloadable one by one, before the combined workbook
+        sections = dict(job.get("sections") or {})
         
-        excel_files = {
-            'BOQ': 'boq.xlsx',
-            'Prequalification': 'prequalification.xlsx', 
-            'Technical_Qualification': 'technical_qualification.xlsx',
-            'Summary': 'summary.xlsx',
-            'Payment_Terms': 'payment_terms.xlsx'
-        }
+        def section_ready(section: str, path: str):
+            sections[section] = path
+            updates.put(sections=dict(sections))
+            event_bus.publish(job_id, "section", {"section": section, "download_url": f"/download/{job_id}/{section}"})
         
-        for sheet_name, excel_filename in excel_files.items():
-            file_path = base_path / excel_filename
-            if file_path.exists():
-                source_wb = load_workbook(file_path)
-                source_ws = source_wb.active
-                new_ws = combined_wb.create_sheet(title=sheet_name)
-                
-                # Copy all cell data with formatting
-                for row in source_ws.iter_rows():
-                    for cell in row:
-                        new_cell = new_ws.cell(row=cell.row, column=cell.column, value=cell.value)
-                        if cell.has_style:
-                            new_cell.font = Font(name=cell.font.name, size=cell.font.size, bold=cell.font.bold, italic=cell.font.italic, color=cell.font.color)
-                            new_cell.fill = PatternFill(fill_type=cell.fill.fill_type, start_color=cell.fill.start_color, end_color=cell.fill.end_color)
-                            new_cell.border = Border(left=cell.border.left, right=cell.border.right, top=cell.border.top, bottom=cell.border.bottom)
-                            new_cell.alignment = Alignment(horizontal=cell.alignment.horizontal, vertical=cell.alignment.vertical, wrap_text=cell.alignment.wrap_text)
-                
-                # Copy column widths
-                for col in source_ws.columns:
-                    column_letter = get_column_letter(col[0].column)
-                    if source_ws.column_dimensions[column_letter].width:
-                        new_ws.column_dimensions[column_letter].width = source_ws.column_dimensions[column_letter].width
-                
-                # Copy row heights
-                for row_num in range(1, source_ws.max_row + 1):
-                    if source_ws.row_dimensions[row_num].height:
-                        new_ws.row_dimensions[row_num].height = source_ws.row_dimensions[row_num].height
+        # The pipeline reads the uploads in place; their hashes key the parse cache
+        proc = get_processor()
+        if job.get("kind") == "merged":
+            documents = [(upload["filename"], Path(upload["upload_path"]), upload.get("sha256")) for upload in uploads]
+            await proc.process_rfp_documents(documents, session_folder, Path(result_path),
+                                             on_progress=report_progress, on_section=section_ready)
+        else:
+            await proc.process_rfp(Path(pdf_path), session_folder, Path(result_path), pdf_hash=job.get("sha256"),
+                                   on_progress=report_progress, on_section=section_ready)
         
-        combined_wb.save(result_path)
-        cleanup_temp_files(session_folder)
-        os.remove(pdf_path)
+        # A batch's documents keep their extractions until the batch workbook is built
+        if not job.get("parent_id"):
+            cleanup_temp_files(session_folder)
+        for upload in uploads:
+            os.remove(upload["upload_path"])
         
-        job_store.update_job(job_id, status="completed", result_file=result_path)
+        await updates.drain()
+        await set_status(job_id, "completed", {"download_url": f"/download/{job_id}"}, result_file=result_path)
+        return "completed"
         
     except Exception as e:
-        job_store.update_job(job_id, status="failed", error=str(e))
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
+        await updates.drain()
+        await set_status(job_id, "failed", {"error": str(e)}, error=str(e))
+        cleanup_temp_files(session_folder)
+        for upload in uploads:
+            if upload["upload_path"] and os.path.exists(upload["upload_path"]):
+                os.remove(upload["upload_path"])
+        return "failed"
  
 @app.get("/status/{job_id}")
 async def get_status(job_id: str):
-    job = job_store.get_job(job_id)
+    job = await asyncio.to_thread(job_store.get_job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "queued":
+        job["queue_position"] = job_queue.position(job_id)
+        job["estimated_start_seconds"] = job_queue.estimated_start_seconds(job_id)
+    if job.get("kind") == "batch":
+        job["documents"] = await asyncio.to_thread(batch_coordinator.documents, job)
+        for document in job["documents"]:
+            if document["status"] == "queued":
+                document["queue_position"] = job_queue.position(document["job_id"])
+    else:
+        job["sections_ready"] = [section for section in SECTIONS if section in (job.get("sections") or {})]
     return job
 
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request, last_event_id: str = Header(None)):
+    """Server-Sent Events stream of a job's progress, ending with its final status.
+
+    Opens with the current status, replays anything after Last-Event-ID on
+    reconnect, then pushes stage transitions, extractor completions and the
+    download URL as they happen.
+    """
+    # Subscribe before reading the job so no event falls between the two
+    queue = event_bus.subscribe(job_id)
+    job = await asyncio.to_thread(job_store.get_job, job_id)
+    if not job:
+        event_bus.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+
+    def snapshot(job):
+        data = {"status": job["status"]}
+        if job["status"] == "completed":
+            data["download_url"] = f"/download/{job_id}"
+        elif job["status"] == "failed":
+            data["error"] = job.get("error")
+        elif job["status"] == "queued":
+            data["queue_position"] = job_queue.position(job_id)
+        return {"event": "status", "data": data}
+
+    async def stream():
+        sent = after
+        try:
+            yield format_sse(snapshot(job))
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            pending = event_bus.history(job_id, after)
+            while True:
+                if not pending:
+                    try:
+                        pending = [await asyncio.wait_for(queue.get(), EVENTS_KEEPALIVE_SECONDS)]
+                    except asyncio.TimeoutError:
+                        if await request.is_disconnected():
+                            return
+                        # The job may be running in another worker process, whose events never reach us
+                        current = await asyncio.to_thread(job_store.get_job, job_id)
+                        if not current or current["status"] in TERMINAL_STATUSES:
+                            if current:
+                                yield format_sse(snapshot(current))
+                            return
+                        yield ": keepalive\n\n"
+                        continue
+                record = pending.pop(0)
+                # History and the live queue overlap for events published while we subscribed
+                if record["id"] <= sent:
+                    continue
+                sent = record["id"]
+                yield format_sse(record)
+                if record["event"] == "status" and record["data"]["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            event_bus.unsubscribe(job_id, queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.get("/download/{job_id}")
 async def download_result(job_id: str):
-    job = job_store.get_job(job_id)
+    job = await asyncio.to_thread(job_store.get_job, job_id)
     if not job or job["status"] != "completed":
         raise HTTPException(status_code=404, detail="Result not ready")
     
@@ -154,12 +468,106 @@ async def download_result(job_id: str):
         media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
     )
 
+@app.get("/download/{job_id}/{section}")
+async def download_section(job_id: str, section: str):
+    """One section's sheet on its own, available as soon as its extractor finishes"""
+    if section not in SECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown section; expected one of {', '.join(SECTIONS)}")
+    job = await asyncio.to_thread(job_store.get_job, job_id)
+    path = (job.get("sections") or {}).get(section) if job else None
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Section not ready")
+    
+    sheet_name, _ = SECTIONS[section]
+    return FileResponse(
+        path=path,
+        filename=f"{job['filename'].replace('.pdf', '')}_{sheet_name}.xlsx",
+        media_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
 @app.get("/jobs/active")
 async def get_active_jobs():
     """Get all currently processing jobs"""
-    active_jobs = job_store.get_active_jobs()
+    active_jobs = await asyncio.to_thread(job_store.get_active_jobs)
     return {"active_jobs": active_jobs, "count": len(active_jobs)}
 
+@app.get("/queue/stats")
+async def queue_stats():
+    """Worker pool utilisation and queue depth, overall and per pipeline stage"""
+    return {**job_queue.stats(), "stages": {name: stage.stats() for name, stage in stages.items()},
+            "stage_timings": stage_timings.stats()}
+
+metrics.register("rfp_queue_depth", "Jobs waiting for a pipeline worker", lambda: job_queue.depth)
+metrics.register("rfp_jobs_running", "Jobs currently in the pipeline", lambda: job_queue.running)
+metrics.register("rfp_stage_busy_workers", "Busy workers per pipeline stage",
+                 lambda: [({"stage": name}, stage.busy) for name, stage in stages.items()])
+metrics.register("rfp_stage_waiting_jobs", "Jobs waiting for a worker per pipeline stage",
+                 lambda: [({"stage": name}, stage.waiting) for name, stage in stages.items()])
+metrics.register("rfp_event_subscribers", "Open job event (SSE) streams",
+                 lambda: event_bus.stats()["subscribers"])
+metrics.register("rfp_cache_lookups_total", "Parse and extraction cache lookups",
+                 lambda: [({"cache": name, "result": result}, getattr(cache, attr))
+                          for name, cache in (("parse", parse_cache), ("extraction", extraction_cache))
+                          for result, attr in (("hit", "hits"), ("miss", "misses"))],
+                 kind="counter")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Stage durations, LLM token usage, queue depth and cache hits in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and disk usage of the parse and extraction caches"""
+    return {"parse": parse_cache.stats(), "extraction": extraction_cache.stats()}
+
+def require_admin(admin_key):
+    """Check the X-Admin-Key header against ADMIN_API_KEY.
+
+    Without a configured key the admin endpoints do not exist (404),
+    unless ADMIN_ALLOW_UNAUTHENTICATED=true opts in for local development.
+    """
+    expected = os.getenv("ADMIN_API_KEY")
+    if not expected:
+        if os.getenv("ADMIN_ALLOW_UNAUTHENTICATED", "false").lower() == "true":
+            return
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest((admin_key or "").encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
+
+@app.get("/admin/cache/extractions")
+async def list_extraction_cache(x_admin_key: str = Header(None)):
+    """Inspect cached extraction results"""
+    require_admin(x_admin_key)
+    entries = await asyncio.to_thread(extraction_cache.list_entries)
+    return {"stats": extraction_cache.stats(), "entries": entries}
+
+@app.delete("/admin/cache/extractions")
+async def purge_extraction_cache(name: str = None, expired_only: bool = False, x_admin_key: str = Header(None)):
+    """Purge cached extractions: all, one extractor's (?name=BOQ) or only expired ones"""
+    require_admin(x_admin_key)
+    removed = await asyncio.to_thread(extraction_cache.purge, name, expired_only)
+    return {"removed": removed}
+
+@app.delete("/admin/cache/extractions/{key}")
+async def delete_extraction_cache_entry(key: str, x_admin_key: str = Header(None)):
+    require_admin(x_admin_key)
+    if not all(c in "0123456789abcdef" for c in key) or not extraction_cache.delete(key):
+        raise HTTPException(status_code=404, detail="Cache entry not found")
+    return {"removed": 1}
+
+@app.get("/admin/retention")
+async def retention_stats(x_admin_key: str = Header(None)):
+    """Retention settings, result directory usage and space reclaimed so far"""
+    require_admin(x_admin_key)
+    return await asyncio.to_thread(retention_sweeper.stats)
+
+@app.post("/admin/retention/sweep")
+async def run_retention_sweep(x_admin_key: str = Header(None)):
+    """Run an eviction pass now instead of waiting for the next interval"""
+    require_admin(x_admin_key)
+    return await asyncio.to_thread(retention_sweeper.sweep)
+
 @app.get("/health/")
 async def health_check():
     return JSONResponse(content={"status": "ok", "message": "Service is running"})
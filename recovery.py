@@ -0,0 +1,88 @@
+import asyncio
+import os
+import socket
+import uuid
+
+from dotenv import load_dotenv
+
+from batch import batch_coordinator
+from job_store import job_store
+from src.pipeline.job_queue import job_queue
+
+load_dotenv()
+
+
+class JobRecovery:
+    """Requeues jobs whose worker died before finishing them.
+
+    Every worker heartbeats into the job store and stamps the jobs it
+    accepts with its owner id. Queued or processing jobs whose owner stopped
+    heartbeating (recycled by max_requests, killed by the timeout, crashed)
+    are claimed by a live worker and resubmitted; the pipeline then skips
+    every stage whose checkpoint is already on disk. A batch has no work
+    of its own to resume: it is consolidated if its documents all finished
+    in the meantime, and otherwise waits for them.
+    """
+
+    def __init__(self):
+        self.interval = float(os.getenv("JOB_RECOVERY_INTERVAL_SECONDS", 30))
+        self.max_resumes = int(os.getenv("JOB_MAX_RESUMES", 3))
+        self.owner = None
+        self.totals = {"resumed": 0, "abandoned": 0}
+
+    @property
+    def stale_after(self) -> float:
+        return self.interval * 4
+
+    def start(self):
+        """Register this worker; call after fork so each process gets its own id"""
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        job_store.heartbeat(self.owner)
+
+    def stop(self):
+        """Deregister so a replacement worker can take over our jobs straight away"""
+        if self.owner:
+            job_store.remove_worker(self.owner)
+
+    async def recover(self) -> int:
+        """Claim orphaned jobs and put them back in the queue; returns how many were resumed"""
+        claimed = await asyncio.to_thread(job_store.claim_orphaned_jobs, self.owner, self.stale_after)
+        resumed = 0
+        for job in claimed:
+            if job.get("kind") == "batch":
+                await batch_coordinator.finish(job, self.owner, takeover=True)
+                continue
+            upload_path = job.get("upload_path")
+            # A merged package job reads several uploads
+            upload_paths = [upload["upload_path"] for upload in job["uploads"]] if job.get("uploads") else [upload_path]
+            if job["resumes"] > self.max_resumes:
+                error = f"Interrupted {job['resumes']} times, giving up"
+            elif not all(path and os.path.exists(path) for path in upload_paths):
+                error = "Interrupted and the uploaded PDF is no longer available"
+            else:
+                await asyncio.to_thread(job_store.update_job, job["id"], status="queued")
+                # A batch's documents rejoin their batch's group, as /process-batch/ queued them
+                await job_queue.submit(job["id"], upload_path, job["filename"], force=True,
+                                       group=job.get("parent_id") or job["id"])
+                print(f"♻️ Resuming interrupted job {job['id']} (attempt {job['resumes'] + 1})")
+                resumed += 1
+                continue
+            await asyncio.to_thread(job_store.finish_job, job["id"], "failed", error=error)
+            self.totals["abandoned"] += 1
+            if job.get("parent_id"):
+                await batch_coordinator.child_finished(job["parent_id"], job["id"], "failed", self.owner)
+        self.totals["resumed"] += resumed
+        return resumed
+
+    async def run_forever(self):
+        """Heartbeat and look for orphaned jobs every interval until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(job_store.heartbeat, self.owner)
+                await self.recover()
+            except Exception as e:
+                print(f"⚠️ Job recovery failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+job_recovery = JobRecovery()
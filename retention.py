@@ -0,0 +1,155 @@
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from job_store import job_store
+from src import metrics
+
+load_dotenv()
+
+
+class RetentionSweeper:
+    """Evicts old job records together with their result workbooks.
+
+    A job is evicted once it is older than JOB_RETENTION_DAYS, or, oldest
+    first, while the results directory holds more than RESULTS_MAX_BYTES.
+    Queued and processing jobs are never touched, nor are the finished
+    documents of a batch still waiting to consolidate them. Result files no
+    job refers to any more are removed as well.
+    """
+
+    def __init__(self, results_dir: str = None):
+        self.results_dir = Path(results_dir or os.getenv("RESULTS_DIR", "/home/site/wwwroot/results"))
+        self.retention_days = float(os.getenv("JOB_RETENTION_DAYS", 7))
+        self.max_bytes = int(os.getenv("RESULTS_MAX_BYTES", 5 * 1024 ** 3))
+        self.interval = float(os.getenv("RETENTION_SWEEP_INTERVAL_SECONDS", 3600))
+        # Files younger than this may belong to a job whose record is not written yet
+        self.orphan_grace_seconds = 3600
+        self._lock = threading.Lock()
+        self.totals = {"sweeps": 0, "jobs_evicted": 0, "files_deleted": 0, "bytes_reclaimed": 0}
+        self.last_sweep = None
+
+    def _result_files(self) -> dict:
+        files = {}
+        if not self.results_dir.exists():
+            return files
+        for entry in os.scandir(self.results_dir):
+            if entry.is_file():
+                stat = entry.stat()
+                files[entry.path] = (stat.st_size, stat.st_mtime)
+        return files
+
+    def _job_files(self, job: dict) -> list:
+        """Combined workbook plus the per-section workbooks published while the job ran"""
+        return [path for path in [job.get("result_file"), *(job.get("sections") or {}).values()] if path]
+
+    def _in_running_batch(self, job: dict) -> bool:
+        """A batch's document whose batch still needs it for the consolidated workbook"""
+        parent = job_store.get_job(job["parent_id"]) if job.get("parent_id") else None
+        return parent is not None and parent["status"] in ("queued", "processing")
+
+    def _delete_job_files(self, job: dict) -> tuple:
+        """(files deleted, bytes reclaimed)"""
+        sizes = [self._delete_file(path) for path in self._job_files(job)]
+        return sum(1 for size in sizes if size > 0), sum(sizes)
+
+    def _delete_file(self, path: str) -> int:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except OSError:
+            return 0
+
+    def sweep(self) -> dict:
+        """One eviction pass; returns what it reclaimed"""
+        with self._lock:
+            started = time.time()
+            evicted, files_deleted, reclaimed = [], 0, 0
+
+            # 1. Age: everything finished before the retention cutoff
+            if self.retention_days > 0:
+                cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+                for job in list(job_store.iter_finished_jobs(created_before=cutoff)):
+                    if self._in_running_batch(job):
+                        continue
+                    evicted.append(job["id"])
+                    deleted, size = self._delete_job_files(job)
+                    files_deleted += deleted
+                    reclaimed += size
+
+            # 2. Size: oldest finished jobs first until the results fit the budget
+            files = self._result_files()
+            total = sum(size for size, _ in files.values())
+            if self.max_bytes > 0 and total > self.max_bytes:
+                already = set(evicted)
+                for job in list(job_store.iter_finished_jobs()):
+                    if total <= self.max_bytes:
+                        break
+                    if job["id"] in already or not self._job_files(job) or self._in_running_batch(job):
+                        continue
+                    evicted.append(job["id"])
+                    deleted, size = self._delete_job_files(job)
+                    files_deleted += deleted
+                    reclaimed += size
+                    total -= size
+
+            job_store.delete_jobs(evicted)
+
+            # 3. Orphans: result files whose job record is gone
+            for path, (size, mtime) in self._result_files().items():
+                if started - mtime < self.orphan_grace_seconds:
+                    continue
+                # {job_id}.xlsx, {job_id}.{section}.xlsx or a leftover .partial
+                if job_store.get_job(Path(path).name.split(".")[0]) is None:
+                    size = self._delete_file(path)
+                    files_deleted += int(size > 0)
+                    reclaimed += size
+
+            result = {
+                "jobs_evicted": len(evicted),
+                "files_deleted": files_deleted,
+                "bytes_reclaimed": reclaimed,
+                "duration_seconds": round(time.time() - started, 3)
+            }
+            self.totals["sweeps"] += 1
+            self.totals["jobs_evicted"] += len(evicted)
+            self.totals["files_deleted"] += files_deleted
+            self.totals["bytes_reclaimed"] += reclaimed
+            metrics.retention_jobs_evicted.inc(len(evicted))
+            metrics.retention_bytes_reclaimed.inc(reclaimed)
+            self.last_sweep = {"at": datetime.now().isoformat(), **result}
+
+        if evicted or files_deleted:
+            print(f"🧹 Retention sweep: evicted {len(evicted)} jobs, "
+                  f"reclaimed {reclaimed / 1024 ** 2:.1f} MB")
+        return result
+
+    def stats(self) -> dict:
+        files = self._result_files()
+        return {
+            "retention_days": self.retention_days,
+            "max_bytes": self.max_bytes,
+            "interval_seconds": self.interval,
+            "result_files": len(files),
+            "result_bytes": sum(size for size, _ in files.values()),
+            "totals": dict(self.totals),
+            "last_sweep": self.last_sweep
+        }
+
+    async def run_forever(self):
+        """Sweep every interval until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                print(f"⚠️ Retention sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+retention_sweeper = RetentionSweeper()
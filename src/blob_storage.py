@@ -3,6 +3,8 @@ from azure.identity import DefaultAzureCredential
 import os
 from datetime import datetime
 
+from .metrics import timed
+
 class BlobStorage:
     def __init__(self):
         self.connection_string = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
@@ -31,7 +33,7 @@ class BlobStorage:
         base_name = original_filename.replace('.pdf', '')
         blob_name = f"{base_name}_{timestamp}.xlsx"
         
-        with open(file_path, "rb") as data:
+        with open(file_path, "rb") as data, timed("blob_upload"):
             self.blob_client.get_blob_client(
                 container=self.container_name, 
                 blob=blob_name
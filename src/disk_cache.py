@@ -0,0 +1,125 @@
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+
+class DiskCache:
+    """Size-bounded on-disk key/value cache with least-recently-used eviction.
+
+    Entries are text files sharded by key prefix; a hit bumps the file's
+    mtime so eviction can drop the least recently used entries first.
+    """
+
+    suffix = ".txt"
+
+    def __init__(self, cache_dir: str, max_bytes: int, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Raw entry text or None, refreshing the entry's LRU position (not counted as a lookup)"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            os.utime(path, None)
+        except OSError:
+            return None
+        return text
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached text or None, counting the lookup as a hit or miss"""
+        text = self.get_text(key)
+        if self.enabled:
+            self._record(text is not None)
+        return text
+
+    def put(self, key: str, text: str):
+        """Store text atomically, then evict least recently used entries"""
+        if not self.enabled:
+            return
+
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError as e:
+            print(f"⚠️ Cache write failed in {self.cache_dir}: {e}")
+
+    def delete(self, key: str) -> bool:
+        try:
+            self._entry_path(key).unlink()
+            return True
+        except OSError:
+            return False
+
+    def _entries(self) -> list:
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for path in self.cache_dir.glob(f"*/*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self) -> int:
+        """Remove every cached entry, returning how many were removed"""
+        removed = 0
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes
+        }
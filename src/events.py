@@ -0,0 +1,89 @@
+import asyncio
+import contextvars
+import itertools
+import json
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Optional
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+
+class EventBus:
+    """In-process pub/sub of job progress events for the SSE endpoint.
+
+    Each job keeps a short history so a client that connects (or
+    reconnects with Last-Event-ID) mid-job still sees what it missed. A
+    job's history is dropped a few minutes after its final status event.
+    """
+
+    def __init__(self, history: int = 200, linger_seconds: float = 300):
+        self.history_size = history
+        self.linger_seconds = linger_seconds
+        self._subscribers = defaultdict(set)
+        self._history = {}
+        self._ids = itertools.count(1)
+
+    def publish(self, job_id: str, event: str, data: dict):
+        """Record an event and hand it to every subscriber; call from the event loop thread"""
+        record = {"id": next(self._ids), "event": event, "data": {**data, "at": time.time()}}
+        history = self._history.setdefault(job_id, deque(maxlen=self.history_size))
+        history.append(record)
+        for queue in list(self._subscribers.get(job_id, ())):
+            if queue.full():
+                # A stalled client loses its oldest events rather than blocking the pipeline
+                queue.get_nowait()
+            queue.put_nowait(record)
+        if event == "status" and data.get("status") in TERMINAL_STATUSES:
+            asyncio.get_running_loop().call_later(self.linger_seconds, self._history.pop, job_id, None)
+
+    def history(self, job_id: str, after: int = 0) -> list:
+        return [record for record in self._history.get(job_id, ()) if record["id"] > after]
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Queue receiving the job's events from now on; pair with unsubscribe()"""
+        queue = asyncio.Queue(maxsize=self.history_size)
+        self._subscribers[job_id].add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    def stats(self) -> dict:
+        return {
+            "jobs_with_history": len(self._history),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values())
+        }
+
+
+event_bus = EventBus()
+_current_job: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("rfp_event_job", default=None)
+
+
+@contextmanager
+def job_context(job_id: str):
+    """Route emit() calls made in this context (and tasks spawned from it) to job_id's subscribers"""
+    token = _current_job.set(job_id)
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+
+def emit(event: str, **data):
+    """Publish an event for the job being processed in this context, if any"""
+    job_id = _current_job.get()
+    if job_id is not None:
+        event_bus.publish(job_id, event, data)
+
+
+def format_sse(record: dict) -> str:
+    """One SSE message; records without an id (snapshots) leave the client's Last-Event-ID alone"""
+    lines = [f"id: {record['id']}"] if record.get("id") else []
+    lines += [f"event: {record['event']}", f"data: {json.dumps(record['data'])}"]
+    return "\n".join(lines) + "\n\n"
@@ -1,47 +1,26 @@
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
-import re
 import os
 
-def create_prequalification_excel(md_file, excel_file):
-    with open(md_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Pre-Qualification Criteria"
-    
+from ..markdown_parser import Document, parse_markdown
+from .sheet_writer import SheetWriter, save_single_sheet
+
+def render_prequalification_sheet(writer: SheetWriter, document: Document):
+    """Lay out a parsed Pre-Qualification document on a sheet"""
     # Extract project title dynamically
-    title_match = re.search(r'# (.+)', content)
-    project_title = title_match.group(1) if title_match else "Pre-Qualification Criteria"
+    project_title = document.heading() or "Pre-Qualification Criteria"
     
-    # Header
-    ws.merge_cells('A1:F1')
-    ws['A1'] = project_title
-    ws['A1'].font = Font(bold=True, size=16, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    tables = [table for table in document.tables if any(table.header)]
     
-    current_row = 3
+    # Set dynamic column widths (streamed sheets need them before the first row)
+    widest = max([6] + [table.width for table in tables])
+    writer.set_widths({col: 8 if col == 1 else 50 if col == 2 else 30
+                       for col in range(1, widest + 1)})
     
-    # Extract all tables dynamically
-    table_pattern = r'\|[^\n]*\|(?:\n\|[^\n]*\|)+'
-    tables = re.findall(table_pattern, content)
+    # Header
+    writer.title_row(project_title, 6)
+    writer.skip()
     
     for i, table in enumerate(tables):
-        lines = [line.strip() for line in table.strip().split('\n') if line.strip() and '|' in line]
-        if len(lines) < 2:
-            continue
-            
-        # Extract header
-        header_line = lines[0]
-        headers = [cell.strip() for cell in header_line.split('|')[1:-1] if cell.strip()]
-        if not headers:
-            continue
-            
-        # Skip separator lines and extract data
-        data_lines = [line for line in lines[1:] if not re.match(r'^\|[-\s|]+\|$', line)]
+        headers = table.header
         
         # Section header based on content
         section_name = f"PRE-QUALIFICATION TABLE {i+1}"
@@ -54,73 +33,37 @@ def create_prequalification_excel(md_file, excel_file):
         elif any(word in str(headers).lower() for word in ['item', 'emd', 'fee', 'validity']):
             section_name = "DEADLINES & REQUIREMENTS"
         
-        ws.merge_cells(f'A{current_row}:{chr(64+len(headers))}{current_row}')
-        ws[f'A{current_row}'] = section_name
-        ws[f'A{current_row}'].font = Font(bold=True, size=14, color="FFFFFF")
-        ws[f'A{current_row}'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='center')
-        current_row += 1
-        
-        # Add headers
-        for col_num, header in enumerate(headers, 1):
-            ws.cell(row=current_row, column=col_num, value=header)
-            ws.cell(row=current_row, column=col_num).font = Font(bold=True, color="FFFFFF")
-            ws.cell(row=current_row, column=col_num).fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            ws.cell(row=current_row, column=col_num).alignment = Alignment(horizontal='center', vertical='center')
-        current_row += 1
+        writer.section_row(section_name, table.width)
+        writer.header_row(headers)
         
         # Add data
-        for line in data_lines:
-            cells = [cell.strip() for cell in line.split('|')[1:-1]]
-            if len(cells) >= len(headers) and any(cell for cell in cells):
-                for col_num, cell_value in enumerate(cells, 1):
-                    if col_num <= len(headers):
-                        ws.cell(row=current_row, column=col_num, value=cell_value)
-                        ws.cell(row=current_row, column=col_num).alignment = Alignment(wrap_text=True, vertical='top')
-                current_row += 1
+        for row in table.rows:
+            if any(row):
+                writer.data_row(row)
         
-        current_row += 2
+        writer.skip(2)
     
-    # Extract key text sections
+    # Extract key text sections (tables are already rendered above)
     sections = [
-        ("1. GENERAL NOTES", r'## 1\. General Notes\s*(.*?)(?=## 2\.|$)'),
-        ("4. REJECTION CRITERIA", r'## 4\. Rejection Criteria Related to PQ\s*(.*?)(?=## 5\.|$)')
+        ("1. GENERAL NOTES", "1. General Notes"),
+        ("4. REJECTION CRITERIA", "4. Rejection Criteria Related to PQ")
     ]
     
-    for section_title, pattern in sections:
-        section_match = re.search(pattern, content, re.DOTALL)
-        if section_match:
-            ws.merge_cells(f'A{current_row}:F{current_row}')
-            ws[f'A{current_row}'] = section_title
-            ws[f'A{current_row}'].font = Font(bold=True, size=14, color="FFFFFF")
-            ws[f'A{current_row}'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-            ws[f'A{current_row}'].alignment = Alignment(horizontal='center')
-            current_row += 1
+    for section_title, heading in sections:
+        section = document.section(heading)
+        if section:
+            writer.section_row(section_title, 6)
             
-            section_text = section_match.group(1).strip()
-            # Remove table content from text sections
-            section_text = re.sub(r'\|[^\n]*\|(?:\n\|[^\n]*\|)+', '', section_text)
-            section_lines = [line.strip() for line in section_text.split('\n') if line.strip() and not line.startswith('|')]
+            for line in section.lines(include_tables=False):
+                writer.text_row(line, 6)
             
-            for line in section_lines:
-                ws.merge_cells(f'A{current_row}:F{current_row}')
-                ws[f'A{current_row}'] = line
-                ws[f'A{current_row}'].alignment = Alignment(wrap_text=True, vertical='top')
-                current_row += 1
-            
-            current_row += 1
-    
-    # Set dynamic column widths
-    for col in range(1, ws.max_column + 1):
-        col_letter = chr(64 + col)
-        if col == 1:
-            ws.column_dimensions[col_letter].width = 8
-        elif col == 2:
-            ws.column_dimensions[col_letter].width = 50
-        else:
-            ws.column_dimensions[col_letter].width = 30
+            writer.skip()
+
+def create_prequalification_excel(md_file, excel_file):
+    with open(md_file, 'r', encoding='utf-8') as f:
+        content = f.read()
     
-    wb.save(excel_file)
+    save_single_sheet(render_prequalification_sheet, parse_markdown(content), excel_file, "Pre-Qualification Criteria")
     print(f"Pre-Qualification Excel file created: {excel_file}")
 
 if __name__ == "__main__":
@@ -1,96 +1,46 @@
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
 import re
 import os
+
+from ..markdown_parser import Document, parse_markdown
+from .sheet_writer import SheetWriter, save_single_sheet
  
-def create_tq_excel(md_file, excel_file):
-    with open(md_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-   
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Technical Qualification"
-   
+def render_tq_sheet(writer: SheetWriter, document: Document):
+    """Lay out a parsed Technical Qualification document on a sheet"""
     # Extract title dynamically
-    title_match = re.search(r'^# (.+)', content, re.MULTILINE)
-    title = title_match.group(1) if title_match else "Technical Qualification"
-   
-    # Header
-    ws.merge_cells('A1:E1')
-    ws['A1'] = title
-    ws['A1'].font = Font(bold=True, size=16, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    title = document.heading(level=1) or "Technical Qualification"
    
-    current_row = 3
+    # Set column widths (streamed sheets need them before the first row)
+    writer.set_widths({1: 8, 2: 40, 3: 50, 4: 15, 5: 40})
    
-    # Parse all sections dynamically
-    sections = re.findall(r'## (.+?)\n(.*?)(?=##|$)', content, re.DOTALL)
+    # Header
+    writer.title_row(title, 5)
+    writer.skip()
    
-    for section_title, section_content in sections:
+    # Every ## (or deeper) heading starts a section
+    for section in document.sections(min_level=2):
         # Section header
-        ws.merge_cells(f'A{current_row}:E{current_row}')
-        ws[f'A{current_row}'] = section_title.upper()
-        ws[f'A{current_row}'].font = Font(bold=True, size=14, color="FFFFFF")
-        ws[f'A{current_row}'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        ws[f'A{current_row}'].alignment = Alignment(horizontal='center')
-        current_row += 1
-       
-        # Check if section contains a table
-        table_rows = [row.strip() for row in section_content.split('\n') if '|' in row and row.strip()]
+        writer.section_row(section.title.upper(), 5)
        
-        if table_rows:
-            # Process table
-            header_row = None
-            data_rows = []
-           
-            for row in table_rows:
-                if re.match(r'^\|[-\s|]+\|$', row):  # Skip separator rows
-                    continue
-                cells = [cell.strip() for cell in row.split('|')[1:-1]]  # Remove empty first/last
-                if cells:
-                    if header_row is None:
-                        header_row = cells
-                    else:
-                        data_rows.append(cells)
-           
-            # Add table headers
-            if header_row:
-                for col, header in enumerate(header_row, 1):
-                    ws.cell(row=current_row, column=col, value=header)
-                    ws.cell(row=current_row, column=col).font = Font(bold=True, color="FFFFFF")
-                    ws.cell(row=current_row, column=col).fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                    ws.cell(row=current_row, column=col).alignment = Alignment(horizontal='center', vertical='center')
-                current_row += 1
-           
-            # Add table data
-            for row_data in data_rows:
-                for col, cell_value in enumerate(row_data, 1):
-                    ws.cell(row=current_row, column=col, value=cell_value)
-                    ws.cell(row=current_row, column=col).alignment = Alignment(wrap_text=True, vertical='top')
-                current_row += 1
+        if section.tables:
+            # Process tables
+            for table in section.tables:
+                writer.header_row(table.header)
+                for row in table.rows:
+                    writer.data_row(row)
         else:
             # Process non-table content
-            lines = [line.strip() for line in section_content.split('\n') if line.strip()]
-            for line in lines:
+            for line in section.lines():
                 line = re.sub(r'^- ', '', line)  # Remove bullet points
                 if line:
-                    ws.merge_cells(f'A{current_row}:E{current_row}')
-                    ws[f'A{current_row}'] = line
-                    ws[f'A{current_row}'].alignment = Alignment(wrap_text=True, vertical='top')
-                    current_row += 1
+                    writer.text_row(line, 5)
        
-        current_row += 1  # Add space between sections
-   
-    # Set column widths
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 40
-    ws.column_dimensions['C'].width = 50
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 40
+        writer.skip()  # Add space between sections
+ 
+def create_tq_excel(md_file, excel_file):
+    with open(md_file, 'r', encoding='utf-8') as f:
+        content = f.read()
    
-    wb.save(excel_file)
+    save_single_sheet(render_tq_sheet, parse_markdown(content), excel_file, "Technical Qualification")
     print(f"Excel file created: {excel_file}")
  
 if __name__ == "__main__":
@@ -1,99 +1,54 @@
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
-import re
 import os
 
-def create_rfp_excel(md_file, excel_file):
-    with open(md_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "RFP Key Details"
-    
+from ..markdown_parser import Document, parse_markdown
+from .sheet_writer import SheetWriter, save_single_sheet, DARK_SECTION, LIGHT_HEADER
+
+def render_rfp_summary_sheet(writer: SheetWriter, document: Document):
+    """Lay out a parsed RFP key details document on a sheet"""
     # Extract project title
-    project_match = re.search(r'\*\*Project Title:\*\* (.+)', content)
-    project_title = project_match.group(1) if project_match else "RFP Project"
+    project_title = document.field("Project Title") or "RFP Project"
+    
+    # Set column widths (streamed sheets need them before the first row)
+    writer.set_widths({1: 30, 2: 80})
     
     # Header
-    ws.merge_cells('A1:B1')
-    ws['A1'] = project_title
-    ws['A1'].font = Font(bold=True, size=16, color="FFFFFF")
-    ws['A1'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    ws['A1'].alignment = Alignment(horizontal='center', vertical='center')
+    writer.title_row(project_title, 2)
     
     # Extract table data
-    table_match = re.search(r'\| Key Detail \| Information \|\s*\|[-\|]+\|(.*?)(?=## Scope of Work)', content, re.DOTALL)
+    table = document.find_table(["Key Detail", "Information"])
     
-    current_row = 3
-    if table_match:
-        table_data = table_match.group(1).strip()
-        rows = [row.strip() for row in table_data.split('\n') if row.strip() and '|' in row]
-        
+    if table:
         # Headers
-        ws['A2'] = "Key Detail"
-        ws['B2'] = "Information"
-        ws['A2'].font = Font(bold=True, color="FFFFFF")
-        ws['B2'].font = Font(bold=True, color="FFFFFF")
-        ws['A2'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        ws['B2'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        writer.header_row(["Key Detail", "Information"], style=LIGHT_HEADER)
         
-        for row in rows:
-            cells = [cell.strip() for cell in row.split('|')[1:-1]]
-            if len(cells) >= 2:
-                ws[f'A{current_row}'] = cells[0]
-                ws[f'B{current_row}'] = cells[1]
-                ws[f'A{current_row}'].alignment = Alignment(wrap_text=True, vertical='top')
-                ws[f'B{current_row}'].alignment = Alignment(wrap_text=True, vertical='top')
-                current_row += 1
+        for row in table.rows:
+            writer.data_row(row)
+    else:
+        writer.skip()
     
     # Scope of Work section
-    current_row += 1
-    ws.merge_cells(f'A{current_row}:B{current_row}')
-    ws[f'A{current_row}'] = "SCOPE OF WORK"
-    ws[f'A{current_row}'].font = Font(bold=True, size=14, color="FFFFFF")
-    ws[f'A{current_row}'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    ws[f'A{current_row}'].alignment = Alignment(horizontal='center')
-    current_row += 1
+    writer.skip()
+    writer.section_row("SCOPE OF WORK", 2, style=DARK_SECTION)
     
-    scope_match = re.search(r'## Scope of Work\s*(.*?)(?=## Additional Key Details)', content, re.DOTALL)
-    if scope_match:
-        scope_text = scope_match.group(1).strip()
-        scope_lines = [line.strip('- ').strip() for line in scope_text.split('\n') if line.strip()]
-        
-        for line in scope_lines:
-            ws.merge_cells(f'A{current_row}:B{current_row}')
-            ws[f'A{current_row}'] = line
-            ws[f'A{current_row}'].alignment = Alignment(wrap_text=True, vertical='top')
-            current_row += 1
+    scope = document.section("Scope of Work")
+    if scope:
+        for line in scope.lines():
+            writer.text_row(line.strip('- ').strip(), 2)
     
     # Additional Key Details section
-    current_row += 1
-    ws.merge_cells(f'A{current_row}:B{current_row}')
-    ws[f'A{current_row}'] = "ADDITIONAL KEY DETAILS"
-    ws[f'A{current_row}'].font = Font(bold=True, size=14, color="FFFFFF")
-    ws[f'A{current_row}'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    ws[f'A{current_row}'].alignment = Alignment(horizontal='center')
-    current_row += 1
-    
-    additional_match = re.search(r'## Additional Key Details\s*(.*?)(?=---)', content, re.DOTALL)
-    if additional_match:
-        additional_text = additional_match.group(1).strip()
-        additional_lines = [line.strip('- ').strip() for line in additional_text.split('\n') if line.strip()]
-        
-        for line in additional_lines:
-            ws.merge_cells(f'A{current_row}:B{current_row}')
-            ws[f'A{current_row}'] = line
-            ws[f'A{current_row}'].alignment = Alignment(wrap_text=True, vertical='top')
-            current_row += 1
+    writer.skip()
+    writer.section_row("ADDITIONAL KEY DETAILS", 2, style=DARK_SECTION)
     
-    # Set column widths
-    ws.column_dimensions['A'].width = 30
-    ws.column_dimensions['B'].width = 80
+    additional = document.section("Additional Key Details")
+    if additional:
+        for line in additional.lines():
+            writer.text_row(line.strip('- ').strip(), 2)
+
+def create_rfp_excel(md_file, excel_file):
+    with open(md_file, 'r', encoding='utf-8') as f:
+        content = f.read()
     
-    wb.save(excel_file)
+    save_single_sheet(render_rfp_summary_sheet, parse_markdown(content), excel_file, "RFP Key Details")
     print(f"Excel file created: {excel_file}")
 
 if __name__ == "__main__":
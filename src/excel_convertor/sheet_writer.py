@@ -0,0 +1,172 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle
+from openpyxl.utils import get_column_letter
+
+_DARK_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+_SECTION_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+
+# Named styles registered once per workbook; cells reference them by name
+TITLE = "rfp_title"
+SECTION = "rfp_section"
+DARK_SECTION = "rfp_section_dark"
+HEADER = "rfp_header"
+LIGHT_HEADER = "rfp_header_light"
+WRAP = "rfp_wrap"
+
+
+def _named_styles() -> list:
+    return [
+        NamedStyle(name=TITLE, font=Font(bold=True, size=16, color="FFFFFF"), fill=_DARK_FILL,
+                   alignment=Alignment(horizontal='center', vertical='center')),
+        NamedStyle(name=SECTION, font=Font(bold=True, size=14, color="FFFFFF"), fill=_SECTION_FILL,
+                   alignment=Alignment(horizontal='center')),
+        NamedStyle(name=DARK_SECTION, font=Font(bold=True, size=14, color="FFFFFF"), fill=_DARK_FILL,
+                   alignment=Alignment(horizontal='center')),
+        NamedStyle(name=HEADER, font=Font(bold=True, color="FFFFFF"), fill=_DARK_FILL,
+                   alignment=Alignment(horizontal='center', vertical='center')),
+        NamedStyle(name=LIGHT_HEADER, font=Font(bold=True, color="FFFFFF"), fill=_SECTION_FILL),
+        NamedStyle(name=WRAP, alignment=Alignment(wrap_text=True, vertical='top'))
+    ]
+
+
+def new_workbook() -> Workbook:
+    """Write-only workbook with the report styles registered"""
+    wb = Workbook(write_only=True)
+    for style in _named_styles():
+        wb.add_named_style(style)
+    return wb
+
+
+class SheetWriter:
+    """Streams a report sheet top to bottom, one styled row at a time.
+
+    Converters describe their layout through these calls instead of
+    addressing cells directly. Rows go to a write-only worksheet and are
+    flushed as they are produced, so memory stays flat however many rows a
+    BOQ has. Column widths therefore have to be set before the first row,
+    and merges are recorded as ranges rather than cells.
+
+    A stacked writer lays several documents out one below the other on the
+    same sheet: each starts with a banner naming its source, and the first
+    document's column widths apply to all of them.
+    """
+
+    def __init__(self, ws, stacked: bool = False):
+        self.ws = ws
+        self.row = 1
+        self.max_column = 0
+        self.stacked = stacked
+        self._banner = None
+
+    def start_document(self, label: str, last_column: int = 6):
+        """Stacked sheets: the next document's banner, written just before its first row"""
+        self._banner = (label, last_column)
+
+    def _begin(self):
+        if self._banner is None:
+            return
+        label, last_column = self._banner
+        self._banner = None
+        if self.row > 1:
+            self.skip(2)
+        self._merge(last_column)
+        self._write([label], DARK_SECTION)
+
+    def _merge(self, last_column: int):
+        self._begin()
+        self.max_column = max(self.max_column, last_column)
+        if last_column > 1:
+            self.ws.merged_cells.add(f'A{self.row}:{get_column_letter(last_column)}{self.row}')
+
+    def _write(self, values: list, style: str = None):
+        self._begin()
+        cells = []
+        for value in values:
+            cell = WriteOnlyCell(self.ws, value=value)
+            if style is not None:
+                cell.style = style
+            cells.append(cell)
+        self.ws.append(cells)
+        self.max_column = max(self.max_column, len(values))
+        self.row += 1
+
+    def title_row(self, text: str, last_column: int):
+        """Sheet title banner merged across the first last_column columns"""
+        self._merge(last_column)
+        self._write([text], TITLE)
+
+    def section_row(self, text: str, last_column: int, style: str = SECTION):
+        """Section banner merged across the first last_column columns"""
+        self._merge(last_column)
+        self._write([text], style)
+
+    def header_row(self, values: list, style: str = HEADER):
+        self._write(values, style)
+
+    def data_row(self, values: list):
+        self._write(values, WRAP)
+
+    def text_row(self, text: str, last_column: int):
+        """Free text merged across the first last_column columns"""
+        self._merge(last_column)
+        self._write([text], WRAP)
+
+    def skip(self, rows: int = 1):
+        self._begin()
+        for _ in range(rows):
+            self.ws.append([])
+        self.row += rows
+
+    def set_widths(self, widths: dict):
+        """Column widths keyed by 1-based column index; must precede the first row"""
+        if self.row > 1:
+            if self.stacked:
+                # Later documents on a stacked sheet keep the first one's widths
+                return
+            raise RuntimeError("Column widths must be set before any row is written")
+        for column, width in widths.items():
+            self.ws.column_dimensions[get_column_letter(column)].width = width
+
+
+def save_single_sheet(render, document, excel_file: str, title: str):
+    """Render one converter into a workbook of its own (standalone/CLI use)"""
+    save_workbook([(title, render, document)], excel_file)
+
+
+def save_workbook(sheets: list, excel_file: str):
+    """Stream (sheet title, render function, parsed document) entries into one workbook in a single pass"""
+    wb = new_workbook()
+    for title, render, document in sheets:
+        ws = wb.create_sheet(title=title)
+        try:
+            render(SheetWriter(ws), document)
+        except Exception as e:
+            print(f"Excel rendering error for {title}: {e}")
+            # Close the partial sheet's stream before dropping it from the workbook
+            ws.close()
+            wb.remove(ws)
+    wb.save(excel_file)
+
+
+def save_stacked_workbook(sheets: list, excel_file: str):
+    """Like save_workbook, but each entry is (sheet title, render function, [(source label, document)]).
+
+    Every sheet stacks the renders of several documents under source
+    banners, e.g. one section across all the PDFs of a tender package.
+    Sheets without documents are left out.
+    """
+    wb = new_workbook()
+    for title, render, documents in sheets:
+        if not documents:
+            continue
+        ws = wb.create_sheet(title=title)
+        writer = SheetWriter(ws, stacked=True)
+        for label, document in documents:
+            writer.start_document(label)
+            try:
+                render(writer, document)
+            except Exception as e:
+                # Rows already streamed stay; the next document starts below them
+                print(f"Excel rendering error for {title} ({label}): {e}")
+    wb.save(excel_file)
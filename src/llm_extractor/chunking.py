@@ -0,0 +1,459 @@
+import asyncio
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from dotenv import load_dotenv
+
+from .client import Target, get_client, get_async_client
+from .rate_limiter import get_rate_limiter, retry_after_seconds
+from .result_cache import extraction_cache
+from ..metrics import record_llm_usage
+
+load_dotenv()
+
+SEPARATOR_PATTERN = re.compile(r'^\|[-:\s|]+\|$')
+PLACEHOLDER_PATTERN = re.compile(r'^(-+|n/?a|none|not (specified|found|mentioned|available|provided)\b.*)$', re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English RFP text)"""
+    return len(text) // 4 + 1
+
+
+def is_table_line(line: str) -> bool:
+    return line.strip().startswith('|')
+
+
+def split_blocks(lines: List[str]) -> List[List[str]]:
+    """Group lines into paragraphs and whole tables"""
+    blocks, current = [], []
+    for line in lines:
+        if not line.strip():
+            if current:
+                blocks.append(current)
+                current = []
+            continue
+        if current and is_table_line(line) != is_table_line(current[-1]):
+            blocks.append(current)
+            current = []
+        current.append(line)
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def split_table(block: List[str], max_tokens: int) -> List[List[str]]:
+    """Split an oversized table into row groups that each repeat the header"""
+    header = block[:2] if len(block) > 1 and SEPARATOR_PATTERN.match(block[1].strip()) else block[:1]
+    rows = block[len(header):]
+    pieces, current, current_tokens = [], [], 0
+    header_tokens = estimate_tokens('\n'.join(header))
+    for row in rows:
+        row_tokens = estimate_tokens(row)
+        if current and header_tokens + current_tokens + row_tokens > max_tokens:
+            pieces.append(header + current)
+            current, current_tokens = [], 0
+        current.append(row)
+        current_tokens += row_tokens
+    if current or not pieces:
+        pieces.append(header + current)
+    return pieces
+
+
+def split_into_chunks(markdown: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """Split markdown into token-bounded chunks on paragraph/table boundaries.
+
+    Consecutive chunks share up to overlap_tokens of trailing blocks so that
+    content straddling a boundary is seen whole by at least one call.
+    """
+    pieces = []
+    for block in split_blocks(markdown.split('\n')):
+        text = '\n'.join(block)
+        if estimate_tokens(text) <= max_tokens:
+            pieces.append(text)
+        elif is_table_line(block[0]):
+            pieces.extend('\n'.join(part) for part in split_table(block, max_tokens))
+        else:
+            # A single giant paragraph: fall back to fixed-size character windows
+            step = max_tokens * 4
+            pieces.extend(text[start:start + step] for start in range(0, len(text), step))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append('\n\n'.join(current))
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous)
+                if carried_tokens + previous_tokens > overlap_tokens or carried_tokens + previous_tokens + piece_tokens > max_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous_tokens
+            current, current_tokens = carried, carried_tokens
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text.lstrip('#').strip()).lower()
+
+
+def _cells(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+def _is_placeholder_row(cells: List[str]) -> bool:
+    values = cells[1:]
+    return bool(values) and all(not value or PLACEHOLDER_PATTERN.match(value) for value in values)
+
+
+def _split_sections(output: str, section_titles: List[str]) -> list:
+    titles = {_normalize(re.sub(r'^\d+\.\s*', '', title)) for title in section_titles}
+    sections = [("", [])]
+    for line in output.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith('#') or _normalize(re.sub(r'^\d+\.\s*', '', stripped)) in titles:
+            sections.append((stripped, []))
+        else:
+            sections[-1][1].append(line)
+    return sections
+
+
+def _merge_bodies(bodies: List[List[str]]) -> List[str]:
+    blocks, tables, seen_lines = [], {}, set()
+    for body in bodies:
+        for block in split_blocks(body):
+            if is_table_line(block[0]):
+                has_separator = len(block) > 1 and SEPARATOR_PATTERN.match(block[1].strip())
+                header = block[0]
+                rows = block[2:] if has_separator else block[1:]
+                key = _normalize(header)
+                if key not in tables:
+                    tables[key] = {"header": header, "rows": [], "by_key": {}, "seen": set()}
+                    blocks.append(("table", key))
+                table = tables[key]
+                for row in rows:
+                    cells = _cells(row)
+                    row_key = _normalize(' '.join(cells))
+                    if row_key in table["seen"]:
+                        continue
+                    first = _normalize(cells[0]) if cells else ""
+                    if first in table["by_key"]:
+                        index = table["by_key"][first]
+                        if _is_placeholder_row(cells):
+                            continue
+                        if _is_placeholder_row(_cells(table["rows"][index])):
+                            table["rows"][index] = row
+                            table["seen"].add(row_key)
+                            continue
+                    table["seen"].add(row_key)
+                    table["by_key"].setdefault(first, len(table["rows"]))
+                    table["rows"].append(row)
+            else:
+                new_lines = []
+                for line in block:
+                    line_key = _normalize(line)
+                    if line_key in seen_lines:
+                        continue
+                    seen_lines.add(line_key)
+                    new_lines.append(line)
+                if new_lines:
+                    blocks.append(("text", new_lines))
+
+    merged = []
+    for kind, value in blocks:
+        if kind == "table":
+            table = tables[value]
+            column_count = len(_cells(table["header"]))
+            lines = [table["header"], '|' + '---|' * column_count] + table["rows"]
+        else:
+            lines = value
+        merged.append('\n'.join(lines))
+    return merged
+
+
+def merge_extractions(outputs: List[str], section_titles: Optional[List[str]] = None) -> str:
+    """Merge per-chunk extraction outputs into one document in the same format.
+
+    Sections are aligned by heading (or by the extractor's fixed section
+    titles), tables with identical headers are concatenated with duplicate
+    rows removed, and repeated lines from overlapping chunks are dropped.
+    """
+    order, headings, bodies = [], {}, {}
+    for output in outputs:
+        for heading, lines in _split_sections(output, section_titles or []):
+            key = _normalize(heading)
+            if key not in bodies:
+                order.append(key)
+                headings[key] = heading
+                bodies[key] = []
+            bodies[key].append(lines)
+
+    parts = []
+    for key in order:
+        merged_body = _merge_bodies(bodies[key])
+        if headings[key]:
+            parts.append(headings[key])
+        parts.extend(merged_body)
+    return '\n\n'.join(parts).strip() + '\n'
+
+
+def _is_context_overflow(error: Exception) -> bool:
+    return getattr(error, "code", None) == "context_length_exceeded" or "maximum context length" in str(error)
+
+
+def _messages(system_prompt: str, user_prompt: str) -> list:
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def _request_cost(system_prompt: str, user_prompt: str, max_completion_tokens: int) -> int:
+    return estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_completion_tokens
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Throttling, server errors and network timeouts are worth retrying; bad requests are not"""
+    if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _log_retry(retry_state):
+    error = retry_state.outcome.exception()
+    print(f"[WARN] Azure OpenAI call failed ({type(error).__name__}), "
+          f"retrying in {retry_state.next_action.sleep:.1f}s (attempt {retry_state.attempt_number})")
+
+
+def _retry_policy() -> dict:
+    """Exponential backoff with full jitter, retrying only transient failures"""
+    return {
+        "retry": retry_if_exception(_is_retryable),
+        "wait": wait_random_exponential(multiplier=1, max=float(os.getenv("AZURE_OPENAI_RETRY_MAX_WAIT", 60))),
+        "stop": stop_after_attempt(int(os.getenv("AZURE_OPENAI_MAX_ATTEMPTS", 4))),
+        "before_sleep": _log_retry,
+        "reraise": True
+    }
+
+
+def _limiter(target: Target):
+    return get_rate_limiter(target.name, target.tokens_per_minute, target.requests_per_minute)
+
+
+def _call(target: Target, system_prompt: str, user_prompt: str, max_completion_tokens: int,
+          name: str) -> str:
+    limiter = _limiter(target)
+    limiter.acquire(_request_cost(system_prompt, user_prompt, max_completion_tokens))
+    try:
+        response = get_client(target).chat.completions.create(
+            messages=_messages(system_prompt, user_prompt),
+            max_completion_tokens=max_completion_tokens,
+            model=target.deployment
+        )
+    except RateLimitError as e:
+        limiter.block_for(retry_after_seconds(e))
+        raise
+    record_llm_usage(name, target.deployment, response.usage)
+    return response.choices[0].message.content
+
+
+async def _call_async(target: Target, system_prompt: str, user_prompt: str, max_completion_tokens: int,
+                      name: str) -> str:
+    limiter = _limiter(target)
+    await limiter.acquire_async(_request_cost(system_prompt, user_prompt, max_completion_tokens))
+    try:
+        response = await get_async_client(target).chat.completions.create(
+            messages=_messages(system_prompt, user_prompt),
+            max_completion_tokens=max_completion_tokens,
+            model=target.deployment
+        )
+    except RateLimitError as e:
+        # May write the shared SQLite bucket
+        await asyncio.to_thread(limiter.block_for, retry_after_seconds(e))
+        raise
+    record_llm_usage(name, target.deployment, response.usage)
+    return response.choices[0].message.content
+
+
+def _log_failover(error: Exception, failed: Target, next_target: Target):
+    print(f"[WARN] {failed.deployment} exhausted retries ({type(error).__name__}), "
+          f"failing over to {next_target.deployment}")
+
+
+def _cache_lookup(targets: List[Target], system_prompt: str, user_prompt: str, max_completion_tokens: int,
+                  name: str) -> tuple:
+    """Cache key for a completion and its cached output, if any.
+
+    Keyed on the primary target so a failover answer is reused for the
+    same request rather than cached under the fallback deployment.
+    """
+    key = extraction_cache.make_key(system_prompt, user_prompt, targets[0], max_completion_tokens)
+    cached = extraction_cache.get(key)
+    if cached is not None:
+        print(f"[INFO] {name}: extraction cache hit, skipping LLM call")
+    return key, cached
+
+
+def _complete(targets: List[Target], system_prompt: str, user_prompt: str, max_completion_tokens: int,
+              name: str) -> str:
+    """One completion with retries, failing over through targets in order"""
+    key, cached = _cache_lookup(targets, system_prompt, user_prompt, max_completion_tokens, name)
+    if cached is not None:
+        return cached
+
+    for index, target in enumerate(targets):
+        try:
+            for attempt in Retrying(**_retry_policy()):
+                with attempt:
+                    output = _call(target, system_prompt, user_prompt, max_completion_tokens, name)
+            break
+        except Exception as e:
+            if not _is_retryable(e) or index == len(targets) - 1:
+                raise
+            _log_failover(e, target, targets[index + 1])
+
+    if output:
+        extraction_cache.store(key, name, targets[0], output)
+    return output
+
+
+async def _complete_async(targets: List[Target], system_prompt: str, user_prompt: str,
+                          max_completion_tokens: int, name: str) -> str:
+    # Disk read and JSON parse; kept off the event loop like the store below
+    key, cached = await asyncio.to_thread(_cache_lookup, targets, system_prompt, user_prompt,
+                                          max_completion_tokens, name)
+    if cached is not None:
+        return cached
+
+    for index, target in enumerate(targets):
+        try:
+            async for attempt in AsyncRetrying(**_retry_policy()):
+                with attempt:
+                    output = await _call_async(target, system_prompt, user_prompt, max_completion_tokens, name)
+            break
+        except Exception as e:
+            if not _is_retryable(e) or index == len(targets) - 1:
+                raise
+            _log_failover(e, target, targets[index + 1])
+
+    if output:
+        await asyncio.to_thread(extraction_cache.store, key, name, targets[0], output)
+    return output
+
+
+def _prompt_overhead(system_prompt: str, build_user_prompt: Callable[[str], str]) -> int:
+    return estimate_tokens(system_prompt) + estimate_tokens(build_user_prompt(""))
+
+
+def _fits_context(content: str, overhead: int) -> bool:
+    return estimate_tokens(content) + overhead <= int(os.getenv("AZURE_OPENAI_MAX_INPUT_TOKENS", 200000))
+
+
+def _plan_chunks(content: str, overhead: int, name: str) -> List[str]:
+    max_input_tokens = int(os.getenv("AZURE_OPENAI_MAX_INPUT_TOKENS", 200000))
+    chunk_tokens = min(int(os.getenv("EXTRACTION_CHUNK_TOKENS", 60000)), max_input_tokens - overhead)
+    overlap_tokens = int(os.getenv("EXTRACTION_CHUNK_OVERLAP_TOKENS", 1000))
+    chunks = split_into_chunks(content, chunk_tokens, overlap_tokens)
+    print(f"[INFO] {name}: map-reduce over {len(chunks)} chunk(s) of <= {chunk_tokens} tokens")
+    return chunks
+
+
+def _frame_chunk(chunk: str, label: str) -> str:
+    return (f"[This is {label} of the RFP. Extract only what appears in this part and "
+            f"omit sections that have no content here.]\n\n{chunk}")
+
+
+def _halve(chunk: str) -> List[str]:
+    return split_into_chunks(chunk, max(1, estimate_tokens(chunk) // 2))
+
+
+def _map_concurrency() -> int:
+    return max(1, int(os.getenv("EXTRACTION_MAP_CONCURRENCY", 4)))
+
+
+def complete_extraction(targets: List[Target], system_prompt: str, build_user_prompt: Callable[[str], str],
+                        content: str, name: str, section_titles: Optional[List[str]] = None,
+                        max_completion_tokens: int = 16384) -> str:
+    """Run an extraction prompt over content, map-reducing when it exceeds the context window"""
+    overhead = _prompt_overhead(system_prompt, build_user_prompt)
+
+    if _fits_context(content, overhead):
+        try:
+            return _complete(targets, system_prompt, build_user_prompt(content), max_completion_tokens, name)
+        except Exception as e:
+            if not _is_context_overflow(e):
+                raise
+            print(f"[WARN] {name} prompt exceeded the context window, switching to map-reduce")
+
+    chunks = _plan_chunks(content, overhead, name)
+
+    def map_chunk(chunk: str, label: str, depth: int = 0) -> List[str]:
+        user_prompt = build_user_prompt(_frame_chunk(chunk, label))
+        try:
+            return [_complete(targets, system_prompt, user_prompt, max_completion_tokens, name)]
+        except Exception as e:
+            if not _is_context_overflow(e) or depth >= 3:
+                raise
+            # The estimate was too optimistic for this chunk: halve it and retry
+            results = []
+            for index, half in enumerate(_halve(chunk), 1):
+                results.extend(map_chunk(half, f"{label}.{index}", depth + 1))
+            return results
+
+    with ThreadPoolExecutor(max_workers=_map_concurrency()) as executor:
+        futures = [
+            executor.submit(map_chunk, chunk, f"part {index} of {len(chunks)}")
+            for index, chunk in enumerate(chunks, 1)
+        ]
+        outputs = [output for future in futures for output in future.result()]
+
+    return merge_extractions(outputs, section_titles)
+
+
+async def complete_extraction_async(targets: List[Target], system_prompt: str,
+                                    build_user_prompt: Callable[[str], str], content: str, name: str,
+                                    section_titles: Optional[List[str]] = None,
+                                    max_completion_tokens: int = 16384) -> str:
+    """Async variant of complete_extraction for an AsyncAzureOpenAI client"""
+    overhead = _prompt_overhead(system_prompt, build_user_prompt)
+
+    if _fits_context(content, overhead):
+        try:
+            return await _complete_async(targets, system_prompt, build_user_prompt(content),
+                                         max_completion_tokens, name)
+        except Exception as e:
+            if not _is_context_overflow(e):
+                raise
+            print(f"[WARN] {name} prompt exceeded the context window, switching to map-reduce")
+
+    chunks = _plan_chunks(content, overhead, name)
+    semaphore = asyncio.Semaphore(_map_concurrency())
+
+    async def map_chunk(chunk: str, label: str, depth: int = 0) -> List[str]:
+        user_prompt = build_user_prompt(_frame_chunk(chunk, label))
+        try:
+            async with semaphore:
+                return [await _complete_async(targets, system_prompt, user_prompt, max_completion_tokens, name)]
+        except Exception as e:
+            if not _is_context_overflow(e) or depth >= 3:
+                raise
+            results = []
+            for index, half in enumerate(_halve(chunk), 1):
+                results.extend(await map_chunk(half, f"{label}.{index}", depth + 1))
+            return results
+
+    mapped = await asyncio.gather(*[
+        map_chunk(chunk, f"part {index} of {len(chunks)}")
+        for index, chunk in enumerate(chunks, 1)
+    ])
+    outputs = [output for results in mapped for output in results]
+
+    return merge_extractions(outputs, section_titles)
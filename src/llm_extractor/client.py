@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+import httpx
+from openai import AzureOpenAI, AsyncAzureOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_lock = threading.Lock()
+_clients = {}
+_async_clients = {}
+
+
+@dataclass(frozen=True)
+class Target:
+    """One Azure OpenAI deployment calls can be sent to"""
+    deployment: str
+    endpoint: str
+    api_key: str
+    api_version: str
+    tokens_per_minute: Optional[int] = None
+    requests_per_minute: Optional[int] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.deployment}@{self.endpoint}"
+
+
+def get_azure_openai_settings() -> dict:
+    """Azure OpenAI configuration from environment variables"""
+    return {
+        "api_key": os.getenv("AZURE_OPENAI_API_KEY"),
+        "endpoint": os.getenv("AZURE_OPENAI_ENDPOINT", "https://allvy-rfp-rg-aai.cognitiveservices.azure.com/"),
+        "deployment": os.getenv("AZURE_OPENAI_MODEL", "gpt-5-mini"),
+        "api_version": os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
+    }
+
+
+def _fallback_targets(primary: Target) -> List[Target]:
+    """Parse AZURE_OPENAI_FALLBACKS.
+
+    Either a comma-separated list of deployment names on the primary
+    endpoint, or a JSON list of objects with "deployment" and optional
+    "endpoint", "api_key", "api_version", "tpm" and "rpm" keys.
+    """
+    raw = os.getenv("AZURE_OPENAI_FALLBACKS", "").strip()
+    if not raw:
+        return []
+
+    if raw.startswith('['):
+        entries = json.loads(raw)
+    else:
+        entries = [{"deployment": name.strip()} for name in raw.split(',') if name.strip()]
+
+    return [
+        Target(
+            deployment=entry["deployment"],
+            endpoint=entry.get("endpoint", primary.endpoint),
+            api_key=entry.get("api_key", primary.api_key),
+            api_version=entry.get("api_version", primary.api_version),
+            tokens_per_minute=entry.get("tpm"),
+            requests_per_minute=entry.get("rpm")
+        )
+        for entry in entries
+    ]
+
+
+def get_targets() -> List[Target]:
+    """Primary deployment followed by the configured fallbacks, in failover order"""
+    settings = get_azure_openai_settings()
+    if not settings["api_key"]:
+        raise ValueError("AZURE_OPENAI_API_KEY environment variable is required")
+    primary = Target(settings["deployment"], settings["endpoint"], settings["api_key"], settings["api_version"])
+    return [primary] + _fallback_targets(primary)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("AZURE_OPENAI_MAX_CONNECTIONS", 50)),
+        max_keepalive_connections=int(os.getenv("AZURE_OPENAI_MAX_KEEPALIVE", 20)),
+        keepalive_expiry=float(os.getenv("AZURE_OPENAI_KEEPALIVE_SECONDS", 120))
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    # Extractions with 16k completion tokens can legitimately run for minutes
+    return httpx.Timeout(float(os.getenv("AZURE_OPENAI_TIMEOUT", 600)), connect=10.0)
+
+
+def _client_kwargs(target: Target) -> dict:
+    return {
+        "azure_endpoint": target.endpoint,
+        "api_key": target.api_key,
+        "api_version": target.api_version,
+        # Retries and backoff are handled by chunking's policy, not the SDK
+        "max_retries": 0
+    }
+
+
+def get_client(target: Target = None) -> AzureOpenAI:
+    """Process-wide AzureOpenAI client per endpoint, backed by one keep-alive connection pool.
+
+    trust_env=False keeps proxy environment variables from interfering with
+    the client, without stripping them from os.environ for the whole process.
+    """
+    target = target or get_targets()[0]
+    key = (target.endpoint, target.api_key, target.api_version)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = AzureOpenAI(
+                    **_client_kwargs(target),
+                    http_client=httpx.Client(limits=_limits(), timeout=_timeout(), trust_env=False)
+                )
+                _clients[key] = client
+    return client
+
+
+def get_async_client(target: Target = None) -> AsyncAzureOpenAI:
+    """AsyncAzureOpenAI client per endpoint for the running event loop.
+
+    httpx async connections are bound to the loop that opened them, so one
+    client is kept per loop.
+    """
+    target = target or get_targets()[0]
+    loop = asyncio.get_running_loop()
+    key = (loop, target.endpoint, target.api_key, target.api_version)
+    client = _async_clients.get(key)
+    if client is None:
+        with _lock:
+            for stale in [known for known in _async_clients if known[0].is_closed()]:
+                del _async_clients[stale]
+            client = _async_clients.get(key)
+            if client is None:
+                client = AsyncAzureOpenAI(
+                    **_client_kwargs(target),
+                    http_client=httpx.AsyncClient(limits=_limits(), timeout=_timeout(), trust_env=False)
+                )
+                _async_clients[key] = client
+    return client
@@ -1,45 +1,27 @@
+import asyncio
 import os
 import pandas as pd
-from openai import AzureOpenAI
 from dotenv import load_dotenv
 import json
 import re
 
+from .chunking import complete_extraction, complete_extraction_async
+from .client import get_targets
+from ..markdown_parser import parse_markdown
+
 load_dotenv()
 
-def extract_payment_terms(rfp_content: str, output_path: str):
-    """
-    Extract payment terms from RFP content using Azure OpenAI
-    """
-    
-    # Get Azure OpenAI configuration from environment variables
-    subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "https://allvy-rfp-rg-aai.cognitiveservices.azure.com/")
-    model_name = os.getenv("AZURE_OPENAI_MODEL", "gpt-5-mini")
-    deployment = os.getenv("AZURE_OPENAI_MODEL", "gpt-5-mini")
-    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
-    
-    if not subscription_key:
-        print("[ERROR] AZURE_OPENAI_API_KEY environment variable is required")
-        return False
-    
-    try:
-        # Clear proxy environment variables to avoid conflicts
-        proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'ALL_PROXY', 'all_proxy']
-        for var in proxy_vars:
-            os.environ.pop(var, None)
-        
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=subscription_key,
-            api_version=api_version
-        )
-    except Exception as e:
-        print(f"Error initializing Azure OpenAI client: {str(e)}")
-        return False
-    
-    # System prompt for extracting payment terms
-    system_prompt = """You are an expert RFP analyst.
+# Fixed section headings of the payment terms output, used to align map-reduce partials
+PAYMENT_SECTION_TITLES = [
+    "1. Payment Schedule / Milestones",
+    "2. Advance Payment",
+    "3. Retention / Holdback",
+    "4. Penalties / Deductions",
+    "5. Other Payment-Linked Conditions"
+]
+
+# System prompt for extracting payment terms
+SYSTEM_PROMPT = """You are an expert RFP analyst.
 
 Your task is to extract ONLY the Payment Terms from the given RFP.
 
@@ -98,35 +80,59 @@ Do not add explanations or commentary.
 
 The only structure that is fixed is the five main sections above."""
 
-    user_prompt = f"""Please analyze the following RFP content and extract all payment terms:
+def build_user_prompt(content: str) -> str:
+    return f"""Please analyze the following RFP content and extract all payment terms:
 
-{rfp_content}
+{content}
 
 Extract and organize all payment-related information into the structured format specified."""
 
+def _completion_args(rfp_content: str):
+    """complete_extraction arguments, or None when Azure OpenAI is not configured"""
     try:
-        print("[INFO] Analyzing RFP content for payment terms...")
-        
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_completion_tokens=16384,
-            model=deployment
-        )
-        
-        extracted_content = response.choices[0].message.content
-        
-        # Save to markdown file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(extracted_content)
-        
-        print(f"[SUCCESS] Payment terms extracted and saved to {output_path}")
-        print(f"[INFO] Extracted content length: {len(extracted_content)} characters")
-        
-        return extracted_content
-        
+        targets = get_targets()
+    except Exception as e:
+        print(f"Error loading Azure OpenAI configuration: {str(e)}")
+        return None
+    
+    print("[INFO] Analyzing RFP content for payment terms...")
+    return (targets, SYSTEM_PROMPT, build_user_prompt, rfp_content, "Payment terms", PAYMENT_SECTION_TITLES)
+
+def _save(extracted_content: str, output_path: str):
+    """Write the extraction to its markdown file; returns the extracted content"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(extracted_content)
+    
+    print(f"[SUCCESS] Payment terms extracted and saved to {output_path}")
+    print(f"[INFO] Extracted content length: {len(extracted_content)} characters")
+    
+    return extracted_content
+
+def extract_payment_terms(rfp_content: str, output_path: str):
+    """
+    Extract payment terms from RFP content using Azure OpenAI
+    """
+    args = _completion_args(rfp_content)
+    if args is None:
+        return False
+    
+    try:
+        return _save(complete_extraction(*args), output_path)
+    except Exception as e:
+        print(f"[ERROR] Error extracting payment terms: {str(e)}")
+        return None
+
+async def extract_payment_terms_async(rfp_content: str, output_path: str):
+    """
+    Async variant of extract_payment_terms built on AsyncAzureOpenAI
+    """
+    args = _completion_args(rfp_content)
+    if args is None:
+        return False
+    
+    try:
+        extracted_content = await complete_extraction_async(*args)
+        return await asyncio.to_thread(_save, extracted_content, output_path)
     except Exception as e:
         print(f"[ERROR] Error extracting payment terms: {str(e)}")
         return None
@@ -138,52 +144,31 @@ def convert_to_excel(payment_terms_content: str, excel_path: str):
     try:
         print("[INFO] Converting payment terms to Excel format...")
         
-        # Parse the content and create structured data
+        # Parse the content once and split it at the section titles
         sections = {
-            'Payment Schedule / Milestones': [],
-            'Advance Payment': [],
-            'Retention / Holdback': [],
-            'Penalties / Deductions': [],
-            'Other Payment-Linked Conditions': []
+            'Payment Schedule / Milestones': None,
+            'Advance Payment': None,
+            'Retention / Holdback': None,
+            'Penalties / Deductions': None,
+            'Other Payment-Linked Conditions': None
         }
         
-        # Split content by sections
-        lines = payment_terms_content.split('\n')
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if line is a section header
-            if any(section in line for section in sections.keys()):
-                # Save previous section content
-                if current_section and current_content:
-                    sections[current_section] = '\n'.join(current_content)
-                
-                # Start new section
-                for section in sections.keys():
-                    if section in line:
-                        current_section = section
-                        current_content = []
-                        break
-            else:
-                if current_section:
-                    current_content.append(line)
-        
-        # Save last section
-        if current_section and current_content:
-            sections[current_section] = '\n'.join(current_content)
+        document = parse_markdown(payment_terms_content)
+        for found in document.split_at(list(sections.keys())):
+            for section in sections.keys():
+                if section.lower() in found.title.lower():
+                    if found.blocks:
+                        sections[section] = found
+                    break
         
         # Create Excel workbook with multiple sheets
         with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
             
             # Summary sheet
             summary_data = []
-            for section, content in sections.items():
-                if content:
+            for section, found in sections.items():
+                if found:
+                    content = '\n'.join(found.lines())
                     summary_data.append({
                         'Section': section,
                         'Content': content,
@@ -195,33 +180,23 @@ def convert_to_excel(payment_terms_content: str, excel_path: str):
                 summary_df.to_excel(writer, sheet_name='Payment Terms Summary', index=False)
             
             # Individual sheets for each section
-            for section, content in sections.items():
-                if content:
-                    # Try to parse tables if present
-                    if '|' in content:
-                        # Parse markdown table
-                        table_lines = [line for line in content.split('\n') if '|' in line]
-                        if len(table_lines) >= 2:
-                            headers = [col.strip() for col in table_lines[0].split('|')[1:-1]]
-                            rows = []
-                            for line in table_lines[2:]:  # Skip separator line
-                                row = [col.strip() for col in line.split('|')[1:-1]]
-                                if len(row) == len(headers):
-                                    rows.append(row)
-                            
-                            if rows:
-                                df = pd.DataFrame(rows, columns=headers)
-                                sheet_name = section.replace('/', '_')[:31]  # Excel sheet name limit
-                                df.to_excel(writer, sheet_name=sheet_name, index=False)
-                                continue
+            for section, found in sections.items():
+                if found:
+                    sheet_name = section.replace('/', '_')[:31]  # Excel sheet name limit
+                    
+                    # Use the first table if the section has one
+                    tables = [table for table in found.tables if table.rows]
+                    if tables:
+                        df = pd.DataFrame(tables[0].rows, columns=tables[0].header)
+                        df.to_excel(writer, sheet_name=sheet_name, index=False)
+                        continue
                     
                     # Create simple content sheet
-                    content_lines = [line for line in content.split('\n') if line.strip()]
+                    content_lines = found.lines()
                     df = pd.DataFrame({
                         'Line': range(1, len(content_lines) + 1),
                         'Content': content_lines
                     })
-                    sheet_name = section.replace('/', '_')[:31]  # Excel sheet name limit
                     df.to_excel(writer, sheet_name=sheet_name, index=False)
         
         print(f"[SUCCESS] Payment terms converted to Excel: {excel_path}")
@@ -1,42 +1,14 @@
+import asyncio
 import os
-from openai import AzureOpenAI
 from dotenv import load_dotenv
 
+from .chunking import complete_extraction, complete_extraction_async
+from .client import get_targets
+
 load_dotenv()
 
-def extract_prequalification_criteria(rfp_content: str, output_path: str):
-    """
-    Extract prequalification criteria from RFP content using Azure OpenAI
-    """
-    
-    # Get Azure OpenAI configuration from environment variables
-    subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "https://allvy-rfp-rg-aai.cognitiveservices.azure.com/")
-    model_name = os.getenv("AZURE_OPENAI_MODEL", "gpt-5-mini")
-    deployment = os.getenv("AZURE_OPENAI_MODEL", "gpt-5-mini")
-    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
-    
-    if not subscription_key:
-        print("[ERROR] AZURE_OPENAI_API_KEY environment variable is required")
-        return False
-    
-    try:
-        # Clear proxy environment variables to avoid conflicts
-        proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'ALL_PROXY', 'all_proxy']
-        for var in proxy_vars:
-            os.environ.pop(var, None)
-        
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=subscription_key,
-            api_version=api_version
-        )
-    except Exception as e:
-        print(f"Error initializing Azure OpenAI client: {str(e)}")
-        return False
-    
-    # System prompt for extracting prequalification criteria
-    system_prompt = """You are an expert RFP analyst.
+# System prompt for extracting prequalification criteria
+SYSTEM_PROMPT = """You are an expert RFP analyst.
 
 Your task is to extract ONLY the Pre-Qualification (PQ) Criteria, Eligibility Conditions, and related requirements from the given RFP.
 
@@ -90,35 +62,60 @@ Stage 1: Pre-Qualification Requirements
 - Do not add explanations or commentary.  
 - The only structure that is fixed is the **five main sections above**.
 """
-    user_prompt = f"""Please analyze the following RFP content and extract all prequalification criteria, requirements, and eligibility conditions:
 
-{rfp_content}
+def build_user_prompt(content: str) -> str:
+    return f"""Please analyze the following RFP content and extract all prequalification criteria, requirements, and eligibility conditions:
+
+{content}
 
 Extract and organize all prequalification information into a structured markdown document."""
 
+def _completion_args(rfp_content: str):
+    """complete_extraction arguments, or None when Azure OpenAI is not configured"""
     try:
-        print("[INFO] Analyzing RFP content for prequalification criteria...")
-        
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_completion_tokens=16384,
-            model=deployment
-        )
-        
-        extracted_content = response.choices[0].message.content
-        
-        # Save to markdown file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(extracted_content)
-        
-        print(f"[SUCCESS] Prequalification criteria extracted and saved to {output_path}")
-        print(f"[INFO] Extracted content length: {len(extracted_content)} characters")
-        
-        return True
-        
+        targets = get_targets()
+    except Exception as e:
+        print(f"Error loading Azure OpenAI configuration: {str(e)}")
+        return None
+    
+    print("[INFO] Analyzing RFP content for prequalification criteria...")
+    return (targets, SYSTEM_PROMPT, build_user_prompt, rfp_content, "PQ")
+
+def _save(extracted_content: str, output_path: str):
+    """Write the extraction to its markdown file; returns True"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(extracted_content)
+    
+    print(f"[SUCCESS] Prequalification criteria extracted and saved to {output_path}")
+    print(f"[INFO] Extracted content length: {len(extracted_content)} characters")
+    
+    return True
+
+def extract_prequalification_criteria(rfp_content: str, output_path: str):
+    """
+    Extract prequalification criteria from RFP content using Azure OpenAI
+    """
+    args = _completion_args(rfp_content)
+    if args is None:
+        return False
+    
+    try:
+        return _save(complete_extraction(*args), output_path)
+    except Exception as e:
+        print(f"[ERROR] Error extracting prequalification criteria: {str(e)}")
+        return False
+
+async def extract_prequalification_criteria_async(rfp_content: str, output_path: str):
+    """
+    Async variant of extract_prequalification_criteria built on AsyncAzureOpenAI
+    """
+    args = _completion_args(rfp_content)
+    if args is None:
+        return False
+    
+    try:
+        extracted_content = await complete_extraction_async(*args)
+        return await asyncio.to_thread(_save, extracted_content, output_path)
     except Exception as e:
         print(f"[ERROR] Error extracting prequalification criteria: {str(e)}")
         return False
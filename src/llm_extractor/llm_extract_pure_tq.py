@@ -1,37 +1,13 @@
+import asyncio
 import os
-from openai import AzureOpenAI
 from dotenv import load_dotenv
 
+from .chunking import complete_extraction, complete_extraction_async
+from .client import get_targets
+
 load_dotenv()
 
-def extract_pure_technical_qualification(rfp_content: str, output_path: str):
-    # Get Azure OpenAI configuration from environment variables
-    subscription_key = os.getenv("AZURE_OPENAI_API_KEY")
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "https://allvy-rfp-rg-aai.cognitiveservices.azure.com/")
-    model_name = os.getenv("AZURE_OPENAI_MODEL", "gpt-5-mini")
-    deployment = os.getenv("AZURE_OPENAI_MODEL", "gpt-5-mini")
-    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-12-01-preview")
-    
-    if not subscription_key:
-        print("[ERROR] AZURE_OPENAI_API_KEY environment variable is required")
-        return False
-    
-    try:
-        # Clear proxy environment variables to avoid conflicts
-        proxy_vars = ['HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy', 'ALL_PROXY', 'all_proxy']
-        for var in proxy_vars:
-            os.environ.pop(var, None)
-        
-        client = AzureOpenAI(
-            azure_endpoint=endpoint,
-            api_key=subscription_key,
-            api_version=api_version
-        )
-    except Exception as e:
-        print(f"Error initializing Azure OpenAI client: {str(e)}")
-        return False
-    
-    system_prompt = """You are an expert RFP analyst.
+SYSTEM_PROMPT = """You are an expert RFP analyst.
 
 Extract ONLY the Technical Qualification criteria that are used for SCORING/EVALUATION purposes. 
 
@@ -68,30 +44,56 @@ Look for sections with:
 ---
 Preserve exact RFP wording and structure."""
 
-    user_prompt = f"""Extract ONLY the technical qualification criteria used for scoring/evaluation from this RFP content. Do NOT include pre-qualification or eligibility criteria:
+def build_user_prompt(content: str) -> str:
+    return f"""Extract ONLY the technical qualification criteria used for scoring/evaluation from this RFP content. Do NOT include pre-qualification or eligibility criteria:
+
+{content}"""
+
+def _completion_args(rfp_content: str):
+    """complete_extraction arguments, or None when Azure OpenAI is not configured"""
+    try:
+        targets = get_targets()
+    except Exception as e:
+        print(f"Error loading Azure OpenAI configuration: {str(e)}")
+        return None
+    
+    print("[INFO] Extracting pure technical qualification criteria...")
+    return (targets, SYSTEM_PROMPT, build_user_prompt, rfp_content, "TQ")
+
+def _save(extracted_content: str, output_path: str):
+    """Write the extraction to its markdown file; returns True"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(extracted_content)
+    
+    print(f"[SUCCESS] Pure technical qualification criteria extracted to {output_path}")
+    
+    return True
 
-{rfp_content}"""
+def extract_pure_technical_qualification(rfp_content: str, output_path: str):
+    """
+    Extract the scored technical qualification criteria from RFP content using Azure OpenAI
+    """
+    args = _completion_args(rfp_content)
+    if args is None:
+        return False
+    
+    try:
+        return _save(complete_extraction(*args), output_path)
+    except Exception as e:
+        print(f"[ERROR] Error: {str(e)}")
+        return False
 
+async def extract_pure_technical_qualification_async(rfp_content: str, output_path: str):
+    """
+    Async variant of extract_pure_technical_qualification built on AsyncAzureOpenAI
+    """
+    args = _completion_args(rfp_content)
+    if args is None:
+        return False
+    
     try:
-        print("[INFO] Extracting pure technical qualification criteria...")
-        
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            max_completion_tokens=16384,
-            model=deployment
-        )
-        
-        extracted_content = response.choices[0].message.content
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(extracted_content)
-        
-        print(f"[SUCCESS] Pure technical qualification criteria extracted to {output_path}")
-        return True
-        
+        extracted_content = await complete_extraction_async(*args)
+        return await asyncio.to_thread(_save, extracted_content, output_path)
     except Exception as e:
         print(f"[ERROR] Error: {str(e)}")
         return False
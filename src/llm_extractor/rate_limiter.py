@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Upper bound on a single sleep so freshly refilled budget is noticed promptly
+MAX_WAIT_SLICE = 5.0
+
+
+class _MemoryState:
+    """Bucket state shared by the threads and coroutines of one process"""
+
+    def __init__(self):
+        self._state = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self._state
+
+
+class _SQLiteState:
+    """Bucket state shared by every worker process through one SQLite file"""
+
+    def __init__(self, path: str, name: str):
+        self.path = path
+        self.name = name
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, state TEXT NOT NULL)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT state FROM buckets WHERE name = ?", (self.name,)).fetchone()
+            state = json.loads(row[0]) if row else {}
+            yield state
+            conn.execute("INSERT OR REPLACE INTO buckets (name, state) VALUES (?, ?)", (self.name, json.dumps(state)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+class RateLimiter:
+    """Token bucket over Azure OpenAI TPM and RPM quotas.
+
+    Azure counts max_completion_tokens against TPM when admitting a request,
+    so callers should include it in the cost they acquire. A limit of 0
+    disables that dimension; a Retry-After block applies regardless.
+    """
+
+    def __init__(self, tokens_per_minute: int = None, requests_per_minute: int = None, db_path: str = None,
+                 name: str = "default"):
+        self.name = name
+        self.tokens_per_minute = int(tokens_per_minute if tokens_per_minute is not None else os.getenv("AZURE_OPENAI_TPM", 0))
+        self.requests_per_minute = int(requests_per_minute if requests_per_minute is not None else os.getenv("AZURE_OPENAI_RPM", 0))
+        db_path = db_path or os.getenv("AZURE_OPENAI_RATE_LIMIT_DB")
+        self._state = _SQLiteState(db_path, name) if db_path else _MemoryState()
+
+    @property
+    def enabled(self) -> bool:
+        return self.tokens_per_minute > 0 or self.requests_per_minute > 0
+
+    def _refill(self, state: dict, now: float):
+        if not state:
+            state.update(tokens=float(self.tokens_per_minute), requests=float(self.requests_per_minute),
+                         updated=now, blocked_until=0.0)
+            return
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(self.tokens_per_minute, state["tokens"] + elapsed * self.tokens_per_minute / 60)
+        state["requests"] = min(self.requests_per_minute, state["requests"] + elapsed * self.requests_per_minute / 60)
+        state["updated"] = now
+
+    def _reserve(self, cost: int) -> float:
+        """Take budget for one request, or return how long to wait before trying again"""
+        now = time.time()
+        with self._state.transaction() as state:
+            self._refill(state, now)
+            if now < state["blocked_until"]:
+                return state["blocked_until"] - now
+
+            # A request larger than the whole bucket waits for a full bucket rather than forever
+            tokens_needed = min(cost, self.tokens_per_minute)
+            waits = []
+            if self.tokens_per_minute and state["tokens"] < tokens_needed:
+                waits.append((tokens_needed - state["tokens"]) * 60 / self.tokens_per_minute)
+            if self.requests_per_minute and state["requests"] < 1:
+                waits.append((1 - state["requests"]) * 60 / self.requests_per_minute)
+            if waits:
+                return max(waits)
+
+            if self.tokens_per_minute:
+                state["tokens"] -= tokens_needed
+            if self.requests_per_minute:
+                state["requests"] -= 1
+            return 0.0
+
+    def acquire(self, cost: int):
+        """Block until the quota admits a request costing `cost` tokens"""
+        while True:
+            wait = self._reserve(cost)
+            if wait <= 0:
+                return
+            time.sleep(min(wait, MAX_WAIT_SLICE))
+
+    async def acquire_async(self, cost: int):
+        """Await until the quota admits a request costing `cost` tokens"""
+        # The shared SQLite bucket can wait up to 30s on another worker's lock; keep that off the loop
+        shared = isinstance(self._state, _SQLiteState)
+        while True:
+            wait = await asyncio.to_thread(self._reserve, cost) if shared else self._reserve(cost)
+            if wait <= 0:
+                return
+            await asyncio.sleep(min(wait, MAX_WAIT_SLICE))
+
+    def block_for(self, seconds: float):
+        """Hold every caller back, e.g. for a 429's Retry-After"""
+        until = time.time() + seconds
+        with self._state.transaction() as state:
+            self._refill(state, time.time())
+            state["blocked_until"] = max(state.get("blocked_until", 0.0), until)
+            # The service saw us as over quota: drain what we believed was left
+            state["tokens"] = 0.0
+            state["requests"] = 0.0
+
+
+def retry_after_seconds(error: Exception, default: float = 10.0) -> float:
+    """Wait requested by a throttled response (retry-after-ms / retry-after headers)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return default
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, tokens_per_minute: int = None, requests_per_minute: int = None) -> RateLimiter:
+    """Limiter for one deployment; each deployment has its own quota"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = RateLimiter(tokens_per_minute, requests_per_minute, name=name)
+            _limiters[name] = limiter
+        return limiter
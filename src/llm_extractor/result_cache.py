@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import time
+from typing import Optional, List, Dict, Any
+from dotenv import load_dotenv
+
+from ..disk_cache import DiskCache
+from .client import Target
+
+load_dotenv()
+
+
+class ExtractionCache(DiskCache):
+    """Disk cache of extractor output keyed by prompt, deployment, API version and input"""
+
+    suffix = ".json"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, ttl_seconds: int = None):
+        super().__init__(
+            cache_dir or os.getenv("EXTRACTION_CACHE_DIR", "/home/site/wwwroot/cache/extractions"),
+            max_bytes if max_bytes is not None else os.getenv("EXTRACTION_CACHE_MAX_BYTES", 512 * 1024 ** 2),
+            enabled=os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+        )
+        self.ttl_seconds = int(ttl_seconds if ttl_seconds is not None else os.getenv("EXTRACTION_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+    def make_key(self, system_prompt: str, user_prompt: str, target: Target, max_completion_tokens: int) -> str:
+        raw = json.dumps([system_prompt, user_prompt, target.deployment, target.api_version, max_completion_tokens])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _expired(self, entry: dict) -> bool:
+        return bool(self.ttl_seconds) and time.time() - entry["created_at"] > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached extraction output, or None when missing or past its TTL"""
+        text = self.get_text(key)
+        entry = json.loads(text) if text is not None else None
+        if entry is not None and self._expired(entry):
+            self.delete(key)
+            entry = None
+        if self.enabled:
+            self._record(entry is not None)
+        return entry["content"] if entry else None
+
+    def store(self, key: str, name: str, target: Target, content: str):
+        self.put(key, json.dumps({
+            "key": key,
+            "name": name,
+            "deployment": target.deployment,
+            "api_version": target.api_version,
+            "created_at": time.time(),
+            "content": content
+        }))
+
+    def _load_entries(self) -> List[tuple]:
+        loaded = []
+        for _, size, path in self._entries():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    loaded.append((json.load(f), size))
+            except (OSError, ValueError):
+                continue
+        return loaded
+
+    def list_entries(self) -> List[Dict[str, Any]]:
+        """Metadata of every entry, newest first"""
+        entries = [
+            {
+                "key": entry["key"],
+                "name": entry["name"],
+                "deployment": entry["deployment"],
+                "api_version": entry["api_version"],
+                "created_at": entry["created_at"],
+                "expired": self._expired(entry),
+                "bytes": size
+            }
+            for entry, size in self._load_entries()
+        ]
+        return sorted(entries, key=lambda entry: entry["created_at"], reverse=True)
+
+    def purge(self, name: str = None, expired_only: bool = False) -> int:
+        """Delete entries for one extractor, expired entries, or everything"""
+        if name is None and not expired_only:
+            return self.clear()
+        removed = 0
+        for entry, _ in self._load_entries():
+            if name is not None and entry["name"] != name:
+                continue
+            if expired_only and not self._expired(entry):
+                continue
+            removed += int(self.delete(entry["key"]))
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+
+extraction_cache = ExtractionCache()
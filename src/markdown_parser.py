@@ -0,0 +1,304 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+SEPARATOR_PATTERN = re.compile(r'^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$')
+LIST_ITEM_PATTERN = re.compile(r'^(\s*)([-*+]|\d+[.)])\s+(.*)$')
+RULE_PATTERN = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+# A pipe not preceded by a backslash
+CELL_SPLIT_PATTERN = re.compile(r'(?<!\\)\|')
+LINE_BREAK_PATTERN = re.compile(r'<br\s*/?>', re.IGNORECASE)
+NUMBER_PREFIX_PATTERN = re.compile(r'^\d+[.)]\s*')
+
+
+@dataclass
+class Heading:
+    level: int
+    text: str
+    lines: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Table:
+    """Pipe table; every row is padded or folded to the header's width"""
+    header: List[str]
+    rows: List[List[str]]
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def width(self) -> int:
+        return len(self.header)
+
+
+@dataclass
+class ListBlock:
+    items: List[str]
+    ordered: bool
+    lines: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Paragraph:
+    lines: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.lines)
+
+
+@dataclass
+class Rule:
+    lines: List[str] = field(default_factory=list)
+
+
+Block = Union[Heading, Table, ListBlock, Paragraph, Rule]
+
+
+@dataclass
+class Section:
+    """A heading (None for content before the first one) and the blocks under it"""
+    heading: Optional[Heading]
+    blocks: List[Block] = field(default_factory=list)
+
+    @property
+    def title(self) -> str:
+        return self.heading.text if self.heading else ""
+
+    @property
+    def tables(self) -> List[Table]:
+        return [block for block in self.blocks if isinstance(block, Table)]
+
+    def lines(self, include_tables: bool = True) -> List[str]:
+        """Source lines of the section body"""
+        return [
+            line
+            for block in self.blocks
+            if include_tables or not isinstance(block, Table)
+            for line in block.lines
+        ]
+
+
+@dataclass
+class Document:
+    blocks: List[Block]
+
+    @property
+    def tables(self) -> List[Table]:
+        return [block for block in self.blocks if isinstance(block, Table)]
+
+    @property
+    def headings(self) -> List[Heading]:
+        return [block for block in self.blocks if isinstance(block, Heading)]
+
+    @property
+    def first_line(self) -> Optional[str]:
+        for block in self.blocks:
+            if block.lines:
+                return block.lines[0]
+        return None
+
+    def heading(self, level: int = None) -> Optional[str]:
+        """Text of the first heading, optionally of one level only"""
+        for block in self.headings:
+            if level is None or block.level == level:
+                return block.text
+        return None
+
+    def field(self, label: str) -> Optional[str]:
+        """Value of a "**Label:** value" line"""
+        pattern = re.compile(rf'^[-*+\s]*\**{re.escape(label)}:?\**:?\s*(.+)$', re.IGNORECASE)
+        for block in self.blocks:
+            if isinstance(block, (Paragraph, ListBlock)):
+                for line in block.lines:
+                    match = pattern.match(line)
+                    if match:
+                        return match.group(1).strip()
+        return None
+
+    def find_table(self, header: List[str]) -> Optional[Table]:
+        """First table whose header matches, ignoring case"""
+        wanted = [cell.lower() for cell in header]
+        for table in self.tables:
+            if [cell.lower() for cell in table.header] == wanted:
+                return table
+        return None
+
+    def sections(self, min_level: int = 1) -> List[Section]:
+        """Flat split: each heading at min_level or deeper owns the blocks up to the next such heading"""
+        sections = []
+        for block in self.blocks:
+            if isinstance(block, Heading) and block.level >= min_level:
+                sections.append(Section(block))
+            elif sections:
+                sections[-1].blocks.append(block)
+        return sections
+
+    def section(self, title: str) -> Optional[Section]:
+        """Section under the first heading containing title.
+
+        It runs to the next heading of the same or a higher level, or to a
+        horizontal rule, so nested subsections stay inside it.
+        """
+        wanted = title.lower()
+        for index, block in enumerate(self.blocks):
+            if isinstance(block, Heading) and wanted in block.text.lower():
+                section = Section(block)
+                for child in self.blocks[index + 1:]:
+                    if isinstance(child, Rule) or (isinstance(child, Heading) and child.level <= block.level):
+                        break
+                    section.blocks.append(child)
+                return section
+        return None
+
+    def split_at(self, titles: List[str]) -> List[Section]:
+        """Split on title lines (see is_title_line), whatever block they sit in.
+
+        For outputs whose section titles are plain or numbered lines rather
+        than markdown headings. The matching line becomes the section's
+        heading; content before the first title is dropped. Body lines that
+        merely mention a title stay in their section.
+        """
+        sections = []
+
+        for block in self.blocks:
+            if isinstance(block, Table):
+                if sections:
+                    sections[-1].blocks.append(block)
+                continue
+            pending = []
+            for line in block.lines:
+                if any(is_title_line(line, title) for title in titles):
+                    if pending and sections:
+                        sections[-1].blocks.append(_rebuild(block, pending))
+                    pending = []
+                    sections.append(Section(Heading(0, _strip_markup(line), [line])))
+                else:
+                    pending.append(line)
+            if pending and sections:
+                sections[-1].blocks.append(block if len(pending) == len(block.lines) else _rebuild(block, pending))
+        return sections
+
+
+def _strip_markup(line: str) -> str:
+    return line.strip().lstrip('#').strip().strip('*').strip()
+
+
+def is_title_line(line: str, title: str) -> bool:
+    """Whether the whole line is title, ignoring case, #/** markup and a trailing colon.
+
+    A title given without its number ("Advance Payment") also matches the
+    numbered line ("2. Advance Payment").
+    """
+    text = _strip_markup(line).rstrip(':').strip().lower()
+    wanted = title.strip().lower()
+    return text == wanted or (not NUMBER_PREFIX_PATTERN.match(wanted)
+                              and NUMBER_PREFIX_PATTERN.sub('', text) == wanted)
+
+
+def _rebuild(block: Block, lines: List[str]) -> Block:
+    """A block of the same kind holding a subset of its lines"""
+    if isinstance(block, ListBlock):
+        return ListBlock([LIST_ITEM_PATTERN.match(line).group(3) for line in lines], block.ordered, lines)
+    if isinstance(block, Rule):
+        return Rule(lines)
+    return Paragraph(lines)
+
+
+def split_cells(line: str) -> List[str]:
+    """Cells of a table row; handles escaped pipes and <br> line breaks inside cells"""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    return [
+        LINE_BREAK_PATTERN.sub('\n', cell.strip().replace('\\|', '|'))
+        for cell in CELL_SPLIT_PATTERN.split(line)
+    ]
+
+
+def _fit(cells: List[str], width: int) -> List[str]:
+    """Pad a ragged row to width, folding any overflow into the last column"""
+    if len(cells) < width:
+        return cells + [''] * (width - len(cells))
+    if len(cells) > width and width:
+        overflow = [cell for cell in cells[width - 1:] if cell]
+        return cells[:width - 1] + [' | '.join(overflow)]
+    return cells
+
+
+def _table(lines: List[str]) -> Table:
+    header = split_cells(lines[0])
+    body = lines[1:]
+    if body and SEPARATOR_PATTERN.match(body[0].strip()):
+        body = body[1:]
+    rows = [
+        _fit(split_cells(line), len(header))
+        for line in body
+        if not SEPARATOR_PATTERN.match(line.strip())
+    ]
+    return Table(header, rows, lines)
+
+
+def parse_markdown(content: str) -> Document:
+    """Parse markdown into a flat list of typed blocks in one pass over its lines"""
+    blocks = []
+    table_lines, list_lines, paragraph_lines = [], [], []
+    list_ordered = None
+
+    def flush():
+        nonlocal table_lines, list_lines, paragraph_lines, list_ordered
+        if len(table_lines) > 1:
+            blocks.append(_table(table_lines))
+        elif table_lines:
+            # A lone pipe line is text, not a table
+            paragraph_lines = paragraph_lines + table_lines
+        if list_lines:
+            blocks.append(ListBlock([LIST_ITEM_PATTERN.match(line).group(3) for line in list_lines],
+                                    bool(list_ordered), list_lines))
+        if paragraph_lines:
+            blocks.append(Paragraph(paragraph_lines))
+        table_lines, list_lines, paragraph_lines = [], [], []
+        list_ordered = None
+
+    for raw_line in content.split('\n'):
+        line = raw_line.strip()
+        if not line:
+            flush()
+            continue
+
+        if line.startswith('|'):
+            if not table_lines:
+                flush()
+            table_lines.append(line)
+            continue
+        if table_lines:
+            flush()
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            flush()
+            blocks.append(Heading(len(heading.group(1)), heading.group(2), [line]))
+            continue
+
+        if RULE_PATTERN.match(line):
+            flush()
+            blocks.append(Rule([line]))
+            continue
+
+        item = LIST_ITEM_PATTERN.match(raw_line.rstrip())
+        if item:
+            ordered = item.group(2)[0].isdigit()
+            if paragraph_lines or (list_lines and ordered != list_ordered and not item.group(1)):
+                flush()
+            list_ordered = ordered if list_ordered is None else list_ordered
+            list_lines.append(line)
+            continue
+
+        if list_lines:
+            flush()
+        paragraph_lines.append(line)
+
+    flush()
+    return Document(blocks)
@@ -0,0 +1,188 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# Seconds; pipeline stages range from sub-second renders to half-hour parses
+DEFAULT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 2400)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # labels -> [per-bucket counts, sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_label_text(labels + (('le', _number(bound)),))} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_label_text(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{self.name}_sum{_label_text(labels)} {_number(round(total, 6))}")
+                lines.append(f"{self.name}_count{_label_text(labels)} {count}")
+        return lines
+
+
+class Collected:
+    """Read at scrape time from collect(): a number, or a list of (labels dict, number).
+
+    For values another component already tracks, such as queue depth or
+    cache hit counts; kind is the Prometheus type they are exposed as.
+    """
+
+    def __init__(self, name: str, help: str, collect: Callable, kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            values = self.collect()
+        except Exception as e:
+            print(f"⚠️ Metric {self.name} failed: {e}")
+            return []
+        if not isinstance(values, list):
+            values = [({}, values)]
+        for labels, value in values:
+            lines.append(f"{self.name}{_label_text(tuple(sorted(labels.items())))} {_number(value)}")
+        return lines
+
+
+class JobMetrics:
+    """Stage timings and LLM token usage of one job, stored on its job record"""
+
+    def __init__(self, initial: dict = None):
+        initial = initial or {}
+        self.stages = dict(initial.get("stages", {}))
+        self.llm = {name: dict(usage) for name, usage in initial.get("llm", {}).items()}
+        self._lock = threading.Lock()
+
+    def add_stage(self, key: str, seconds: float):
+        with self._lock:
+            # Accumulates across map-reduce calls and resumed attempts
+            self.stages[key] = round(self.stages.get(key, 0.0) + seconds, 3)
+
+    def add_usage(self, name: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            usage = self.llm.setdefault(name, {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0})
+            usage["requests"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {"stages": dict(self.stages), "llm": {name: dict(usage) for name, usage in self.llm.items()}}
+
+
+stage_seconds = Histogram("rfp_stage_duration_seconds", "Time spent in each pipeline stage")
+llm_requests = Counter("rfp_llm_requests_total", "Completed LLM requests")
+llm_tokens = Counter("rfp_llm_tokens_total", "LLM tokens reported by response.usage")
+jobs_finished = Counter("rfp_jobs_total", "Jobs that left the pipeline, by final status")
+retention_jobs_evicted = Counter("rfp_retention_jobs_evicted_total", "Jobs removed by the retention sweeper")
+retention_bytes_reclaimed = Counter("rfp_retention_bytes_reclaimed_total",
+                                    "Bytes of uploads, results and intermediates deleted by the retention sweeper")
+
+_metrics = [stage_seconds, llm_requests, llm_tokens, jobs_finished, retention_jobs_evicted, retention_bytes_reclaimed]
+_current_job: contextvars.ContextVar[Optional[JobMetrics]] = contextvars.ContextVar("rfp_job_metrics", default=None)
+
+
+def register(name: str, help: str, collect: Callable, kind: str = "gauge"):
+    """Expose a value read from collect() at every scrape"""
+    _metrics.append(Collected(name, help, collect, kind))
+
+
+@contextmanager
+def track_job(initial: dict = None):
+    """Collect the timings and usage recorded in this context (and tasks spawned from it) for one job"""
+    job = JobMetrics(initial)
+    token = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(token)
+
+
+@contextmanager
+def timed(stage: str, name: str = None):
+    """Observe the body's duration as stage (per name, e.g. extractor or sheet) for the current job too"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        labels = {"stage": stage, "name": name} if name else {"stage": stage}
+        stage_seconds.observe(seconds, **labels)
+        job = _current_job.get()
+        if job is not None:
+            job.add_stage(f"{stage}:{name}" if name else stage, seconds)
+
+
+def record_llm_usage(name: str, deployment: str, usage):
+    """Count one completion's response.usage against extractor name"""
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    llm_requests.inc(extractor=name, deployment=deployment)
+    llm_tokens.inc(prompt_tokens, extractor=name, deployment=deployment, kind="prompt")
+    llm_tokens.inc(completion_tokens, extractor=name, deployment=deployment, kind="completion")
+    job = _current_job.get()
+    if job is not None:
+        job.add_usage(name, prompt_tokens, completion_tokens)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,67 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class ConverterPool:
+    """Fixed-size pool of warm Docling converters shared across jobs.
+
+    Each converter is checked out by one thread at a time, so layout and
+    table models are loaded once per pooled instance instead of per PDF.
+    """
+
+    def __init__(self, size: int = None):
+        self.size = max(1, int(size or os.getenv("DOCLING_CONVERTER_POOL_SIZE", 1)))
+        self._available = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _build(self):
+        from docling.datamodel.base_models import InputFormat
+        from docling.document_converter import DocumentConverter
+
+        converter = DocumentConverter()
+        # Models load lazily on first convert; force it so the first job doesn't pay for it
+        if hasattr(converter, "initialize_pipeline"):
+            converter.initialize_pipeline(InputFormat.PDF)
+        return converter
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _new_converter(self):
+        try:
+            return self._build()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def warm(self):
+        """Build every converter in the pool up front"""
+        while self._reserve_slot():
+            self._available.put(self._new_converter())
+        print(f"🔥 Docling converter pool warmed ({self.size} instance(s))")
+
+    @contextmanager
+    def acquire(self):
+        """Check out a converter, building one lazily while the pool has room"""
+        try:
+            converter = self._available.get_nowait()
+        except queue.Empty:
+            if self._reserve_slot():
+                converter = self._new_converter()
+            else:
+                converter = self._available.get()
+        try:
+            yield converter
+        finally:
+            self._available.put(converter)
@@ -0,0 +1,169 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+from dotenv import load_dotenv
+
+from .stages import jobs_in_flight
+from ..metrics import stage_seconds
+
+load_dotenv()
+
+
+class QueueFull(Exception):
+    """The queue is at PIPELINE_QUEUE_MAX; retry after retry_after seconds"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class QueueClosed(Exception):
+    """No workers are accepting jobs (not started yet or shutting down)"""
+
+    def __init__(self, retry_after: int = 30):
+        super().__init__("Job queue is not accepting jobs")
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """Bounded queue of pipeline jobs drained by a fixed pool of workers.
+
+    Admission is refused once max_depth jobs (a batch counting as one)
+    are waiting, so a burst of uploads queues up (or is told to come back
+    later) instead of starting every parse and LLM call at once. Each
+    worker carries one job through the pipeline stages, so by default
+    there is one per stage worker and every stage can be busy with a
+    different job.
+
+    Jobs are queued in groups (a batch's children share one; every other
+    job is its own) and workers take one job from each group in turn, so
+    a large batch cannot hold up single uploads queued behind it.
+    """
+
+    def __init__(self, workers: int = None, max_depth: int = None):
+        self.workers = max(1, int(workers or os.getenv("PIPELINE_WORKERS") or jobs_in_flight()))
+        self.max_depth = max(1, int(max_depth or os.getenv("PIPELINE_QUEUE_MAX", 20)))
+        # group -> OrderedDict(job_id -> (args, enqueued at)), in round-robin order
+        self._groups = OrderedDict()
+        self._running = set()
+        self._available = None
+        self._tasks = []
+        # Running mean of job durations, for Retry-After and queue ETAs
+        self.average_seconds = 120.0
+        self.completed = 0
+
+    @property
+    def depth(self) -> int:
+        return sum(len(jobs) for jobs in self._groups.values())
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def accepting(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, handler: Callable[..., Awaitable]):
+        """Spawn the workers on the running loop; handler(job_id, *args) runs each job"""
+        if self._tasks:
+            return
+        self._available = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker(handler)) for _ in range(self.workers)]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _estimate_wait(self, ahead: int) -> int:
+        """Seconds until a job with `ahead` jobs running or queued before it gets a worker"""
+        turns = max(0, ahead - self.workers + 1)
+        return math.ceil(self.average_seconds * turns / self.workers)
+
+    def check_admission(self):
+        """Raise QueueClosed or QueueFull if a new job would be refused"""
+        if not self.accepting:
+            raise QueueClosed()
+        # Groups, not jobs: a new job waits one turn per group ahead of it
+        if len(self._groups) >= self.max_depth:
+            # A slot frees up whenever the next running job finishes
+            raise QueueFull(max(1, math.ceil(self.average_seconds / self.workers)))
+
+    async def submit(self, job_id: str, *args, force: bool = False, group: str = None):
+        """Enqueue a job, in group if it belongs to one.
+
+        force skips the depth limit: for requeueing jobs admitted once
+        already, and for a batch's children after the batch was admitted.
+        """
+        if force and not self.accepting:
+            raise QueueClosed()
+        if not force:
+            self.check_admission()
+        async with self._available:
+            self._groups.setdefault(group or job_id, OrderedDict())[job_id] = (args, time.time())
+            self._available.notify()
+
+    def _dispatch_order(self) -> list:
+        """Queued job ids in the order workers will take them"""
+        groups = [list(jobs) for jobs in self._groups.values()]
+        order = []
+        for turn in range(max(map(len, groups), default=0)):
+            order.extend(jobs[turn] for jobs in groups if turn < len(jobs))
+        return order
+
+    def _take(self) -> tuple:
+        """Next job from the group at the head of the rotation, which then moves to the back"""
+        group, jobs = self._groups.popitem(last=False)
+        job_id, entry = jobs.popitem(last=False)
+        if jobs:
+            self._groups[group] = jobs
+        return job_id, entry
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based place in line, or None once the job has started"""
+        for index, pending in enumerate(self._dispatch_order(), 1):
+            if pending == job_id:
+                return index
+        return None
+
+    def estimated_start_seconds(self, job_id: str) -> Optional[int]:
+        position = self.position(job_id)
+        if position is None:
+            return None
+        return self._estimate_wait(len(self._running) + position - 1)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "queued": self.depth,
+            "groups": len(self._groups),
+            "max_depth": self.max_depth,
+            "average_job_seconds": round(self.average_seconds, 1),
+            "completed": self.completed
+        }
+
+    async def _worker(self, handler):
+        while True:
+            async with self._available:
+                await self._available.wait_for(lambda: self._groups)
+                job_id, (args, enqueued) = self._take()
+            self._running.add(job_id)
+            started = time.time()
+            stage_seconds.observe(started - enqueued, stage="queue_wait")
+            try:
+                await handler(job_id, *args)
+            except Exception as e:
+                print(f"⚠️ Job {job_id} failed in worker: {e}")
+            finally:
+                self._running.discard(job_id)
+                self.completed += 1
+                self.average_seconds += (time.time() - started - self.average_seconds) / min(self.completed, 20)
+
+
+job_queue = JobQueue()
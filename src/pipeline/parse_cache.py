@@ -0,0 +1,53 @@
+import hashlib
+import os
+from typing import Dict, Any
+from dotenv import load_dotenv
+
+from ..disk_cache import DiskCache
+
+load_dotenv()
+
+
+def _docling_version() -> str:
+    """Installed Docling version, part of every cache key"""
+    try:
+        from importlib.metadata import version
+        return version("docling")
+    except Exception:
+        return "unknown"
+
+
+def hash_file(path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache(DiskCache):
+    """Content-addressed disk cache of Docling markdown, keyed by PDF hash"""
+
+    suffix = ".md"
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        super().__init__(
+            cache_dir or os.getenv("PARSE_CACHE_DIR", "/home/site/wwwroot/cache/parsed"),
+            max_bytes if max_bytes is not None else os.getenv("PARSE_CACHE_MAX_BYTES", 2 * 1024 ** 3),
+            enabled=os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+        )
+        self.docling_version = _docling_version()
+
+    def make_key(self, pdf_sha256: str, options: str = "default") -> str:
+        """Combine PDF hash, Docling version and converter options into one key"""
+        raw = f"{pdf_sha256}:{self.docling_version}:{options}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["docling_version"] = self.docling_version
+        return stats
+
+
+parse_cache = ParseCache()
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+STAGES = ("parse", "extract", "render")
+
+# Used until enough jobs have finished to measure this deployment
+DEFAULT_STAGE_SECONDS = {"parse": 120.0, "extract": 240.0, "render": 5.0}
+
+
+class StageTimings:
+    """Mean wall-clock seconds of each stage over recent jobs; the basis for ETAs.
+
+    Seeded at startup from the stage times stored on completed job
+    records, then updated as jobs finish.
+    """
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self.means = dict(DEFAULT_STAGE_SECONDS)
+        self.samples = {stage: 0 for stage in STAGES}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples[stage] = min(self.samples[stage] + 1, self.window)
+            self.means[stage] += (seconds - self.means[stage]) / self.samples[stage]
+
+    def seed(self, jobs: list):
+        for job in jobs:
+            for stage, seconds in ((job.get("progress") or {}).get("stage_seconds") or {}).items():
+                if stage in self.means:
+                    self.record(stage, seconds)
+
+    def stats(self) -> dict:
+        return {stage: {"mean_seconds": round(self.means[stage], 1), "samples": self.samples[stage]}
+                for stage in STAGES}
+
+
+stage_timings = StageTimings()
+
+
+class JobProgress:
+    """Progress of one job through the stages, reported to a callback as it moves.
+
+    Each stage is weighted by its historical duration (as of the job's
+    start), so percent and eta_seconds reflect where the time actually goes
+    rather than counting stages equally. Within a stage, progress comes
+    from units of work (pages parsed, extractors done, sheets rendered)
+    when they are known.
+    The methods may be called from worker threads; the callback always
+    runs on the event loop.
+    """
+
+    def __init__(self, callback: Optional[Callable[[dict], None]] = None, timings: StageTimings = stage_timings):
+        self.callback = callback
+        self.timings = timings
+        # Frozen for this job so finishing a stage (which updates the means) cannot move percent backwards
+        self.weights = dict(timings.means)
+        self.loop = asyncio.get_running_loop()
+        self.stage = None
+        self.unit = None
+        self.done = 0
+        self.total = 0
+        self.started = None
+        self.finished = set()
+        self.stage_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def start(self, stage: str, total: int = 0, unit: str = None):
+        with self._lock:
+            self.stage, self.total, self.unit, self.done = stage, total, unit, 0
+            self.started = time.time()
+        self._report()
+
+    def set_total(self, total: int, unit: str = None):
+        with self._lock:
+            self.total = total
+            self.unit = unit or self.unit
+        self._report()
+
+    def step(self, units: int = 1):
+        with self._lock:
+            self.done = min(self.done + units, self.total) if self.total else self.done + units
+        self._report()
+
+    def skip(self, stage: str):
+        """Stage already done by an earlier attempt"""
+        with self._lock:
+            self.finished.add(stage)
+            self.stage = stage
+            self.done = self.total = 0
+            self.started = None
+        self._report()
+
+    def finish(self, stage: str):
+        with self._lock:
+            self.finished.add(stage)
+            if self.started is not None:
+                seconds = time.time() - self.started
+                self.stage_seconds[stage] = round(seconds, 1)
+                self.timings.record(stage, seconds)
+            self.started = None
+        self._report()
+
+    def _current_fraction(self) -> float:
+        if self.stage is None or self.stage in self.finished or self.started is None:
+            return 0.0
+        if self.total:
+            return self.done / self.total
+        # No units to count: assume the stage takes its usual time, never claiming it is done
+        return min((time.time() - self.started) / self.weights[self.stage], 0.95)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            weights = self.weights
+            fraction = self._current_fraction()
+            in_stage = self.stage is not None and self.stage not in self.finished
+            completed = sum(weights[stage] for stage in self.finished)
+            remaining = sum(weights[stage] for stage in STAGES if stage not in self.finished and stage != self.stage)
+            current = 0.0
+            if in_stage:
+                completed += weights[self.stage] * fraction
+                current = weights[self.stage] * (1 - fraction)
+                if self.started is not None and 0 < fraction < 1:
+                    # Blend in this job's own pace once it has made some
+                    elapsed = time.time() - self.started
+                    current = (current + elapsed * (1 - fraction) / fraction) / 2
+            total = sum(weights.values())
+            return {
+                "stage": self.stage,
+                "done": self.done,
+                "total": self.total,
+                "unit": self.unit,
+                "percent": round(100 * completed / total, 1) if total else 0.0,
+                "eta_seconds": round(remaining + current),
+                "stage_seconds": dict(self.stage_seconds)
+            }
+
+    def _report(self):
+        if self.callback is None:
+            return
+        snapshot = self.snapshot()
+        try:
+            in_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self.callback(snapshot)
+        else:
+            self.loop.call_soon_threadsafe(self.callback, snapshot)
@@ -1,108 +1,166 @@
 import asyncio
 import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Callable, Dict, Any
 import os
 import sys
 
-from tenacity import retry, stop_after_attempt, wait_exponential
-
 # Add parent directory to path to import existing modules
 sys.path.append(str(Path(__file__).parent.parent))
 
 
-from ..llm_extractor.llm_extract_boq import extract_boq_criteria
-from ..llm_extractor.llm_extract_pq import extract_prequalification_criteria  
-from ..llm_extractor.llm_extract_pure_tq import extract_pure_technical_qualification
-from ..llm_extractor.rfp_llm_summary import extract_rfp_key_details
-from ..llm_extractor.llm_extract_payment_terms import extract_payment_terms
-from .utils import convert_markdown_to_excel
+from ..llm_extractor.llm_extract_boq import extract_boq_criteria_async
+from ..llm_extractor.llm_extract_pq import extract_prequalification_criteria_async
+from ..llm_extractor.llm_extract_pure_tq import extract_pure_technical_qualification_async
+from ..llm_extractor.rfp_llm_summary import extract_rfp_key_details_async
+from ..llm_extractor.llm_extract_payment_terms import extract_payment_terms_async
+from ..excel_convertor.boq_to_excel import render_boq_sheet
+from ..excel_convertor.pq_to_excel import render_prequalification_sheet
+from ..excel_convertor.pure_tq_to_excel import render_tq_sheet
+from ..excel_convertor.rfp_summary_to_excel import render_rfp_summary_sheet
+from ..excel_convertor.payment_terms_to_excel import render_payment_terms_sheet
+from ..excel_convertor.sheet_writer import save_workbook, save_single_sheet, save_stacked_workbook
+from ..markdown_parser import parse_markdown
+from .parse_cache import parse_cache, hash_file
+from .converter_pool import ConverterPool
+from .sharded_parser import ShardedParser, count_pages
+from .section_index import route_context, merge_documents
+from .stages import stages
+from .progress import JobProgress
+from ..metrics import timed
+from ..events import emit
+from .utils import partial_path, write_atomic
+
+# Converter options folded into the parse cache key
+DOCLING_OPTIONS = "DocumentConverter:default"
+
+# Sheets of the combined workbook: (sheet name, extracted markdown file, renderer)
+WORKBOOK_SHEETS = [
+    ("BOQ", "boq.md", render_boq_sheet),
+    ("Prequalification", "prequalification.md", render_prequalification_sheet),
+    ("Technical_Qualification", "technical_qualification.md", render_tq_sheet),
+    ("Summary", "summary.md", render_rfp_summary_sheet),
+    ("Payment_Terms", "payment_terms.md", render_payment_terms_sheet)
+]
+
+# Sections downloadable on their own as soon as their extractor finishes, keyed by markdown file stem
+SECTIONS = {Path(filename).stem: (sheet_name, render) for sheet_name, filename, render in WORKBOOK_SHEETS}
+
+
+def section_result_path(result_path: Path, section: str) -> Path:
+    """Single-sheet workbook of one section, next to the combined result: {job}.{section}.xlsx"""
+    result_path = Path(result_path)
+    return result_path.with_name(f"{result_path.stem}.{section}{result_path.suffix}")
+
+async def render_batch_workbook(documents: list, result_path: Path) -> str:
+    """Stack the extracted sections of several processed PDFs into one workbook.
+
+    documents is [(source label, session folder)]; each sheet holds that
+    section of every document that has it, under a banner naming the source.
+    Runs in a render stage slot like any other workbook.
+    """
+    def render_sync():
+        sheets = []
+        for sheet_name, filename, render in WORKBOOK_SHEETS:
+            sources = []
+            for label, session_folder in documents:
+                markdown_path = Path(session_folder) / "extracted" / filename
+                if markdown_path.exists():
+                    with open(markdown_path, 'r', encoding='utf-8') as f:
+                        sources.append((label, parse_markdown(f.read())))
+            sheets.append((sheet_name, render, sources))
+        partial = partial_path(Path(result_path))
+        with timed("workbook", "batch"):
+            save_stacked_workbook(sheets, str(partial))
+        os.replace(partial, result_path)
+        return str(result_path)
+
+    async with stages["render"].slot():
+        return await asyncio.to_thread(render_sync)
+
+def _timed_render(sheet_name: str, render, progress: JobProgress = None):
+    """Wrap a sheet renderer so its time is recorded per sheet and counted as progress"""
+    def run(writer, document):
+        try:
+            with timed("render", sheet_name):
+                render(writer, document)
+        finally:
+            if progress:
+                progress.step()
+    return run
 
 class RFPProcessor:
     """Main processor for RFP pipeline"""
     
     def __init__(self):
-        pass
+        self.converter_pool = ConverterPool()
+        self.sharded_parser = ShardedParser()
+        # Stage worker pools shared by all concurrent jobs: Docling parses are
+        # CPU/memory heavy, extraction fans out into several LLM calls and
+        # rendering is CPU bound again
+        self.stages = stages
+    
+    def warm_up(self):
+        """Load Docling models before the first job arrives"""
+        self.converter_pool.warm()
+    
+    async def process_rfp(self, pdf_path: Path, session_folder: Path, result_path: Path = None,
+                          pdf_hash: str = None, on_progress: Callable[[dict], None] = None,
+                          on_section: Callable[[str, str], None] = None) -> Dict[str, Any]:
+        """Process RFP through complete pipeline, writing the combined workbook to result_path.
+
+        pdf_hash is the SHA-256 of the PDF when the caller already knows it
+        (computed while receiving the upload), so it is not read twice.
+        on_progress receives a JobProgress snapshot (stage, units done,
+        percent, eta_seconds) on the event loop whenever this job advances.
+        When on_section is given, each section is also rendered into its own
+        workbook beside result_path as soon as its extractor finishes, and
+        on_section(section, path) is called once that file is in place.
+
+        The job passes through the parse, extract and render stages in turn,
+        waiting for a free worker of each, so jobs in different stages run
+        concurrently. Each stage's output in session_folder is a checkpoint:
+        when the same folder is processed again after an interruption,
+        stages whose output already exists are skipped.
+        """
+        progress = JobProgress(on_progress)
+        return await self._run(self.parse_stage(pdf_path, session_folder, pdf_hash, progress),
+                               session_folder, result_path, progress, on_section)
+    
+    async def process_rfp_documents(self, documents: list, session_folder: Path, result_path: Path = None,
+                                    on_progress: Callable[[dict], None] = None,
+                                    on_section: Callable[[str, str], None] = None) -> Dict[str, Any]:
+        """Process a tender split across several PDFs as one logical RFP.
+
+        documents is [(label, pdf_path, pdf_hash or None)], main RFP first.
+        The PDFs are parsed concurrently and merged into one markdown, each
+        part opened by a document marker naming its source, so every
+        extractor runs once over the routed content of the whole package
+        instead of once per PDF. Otherwise behaves like process_rfp.
+        """
+        progress = JobProgress(on_progress)
+        return await self._run(self.parse_documents_stage(documents, session_folder, progress),
+                               session_folder, result_path, progress, on_section)
     
-    async def process_rfp(self, pdf_path: Path, session_folder: Path) -> Dict[str, Any]:
-        """Process RFP through complete pipeline"""
+    async def _run(self, parse, session_folder: Path, result_path: Path, progress: JobProgress,
+                   on_section: Callable[[str, str], None]) -> Dict[str, Any]:
+        """Await the parse stage coroutine, then extract and render"""
         start_time = time.time()
         files_generated = []
+        result_path = result_path or session_folder / "excel" / "rfp_analysis.xlsx"
         
         try:
             # Step 1: Parse PDF to Markdown
             print("🔄 Step 1: Parsing PDF to Markdown...")
-            markdown_path = session_folder / "parsed" / "rfp.md"
-            await self._parse_pdf_to_markdown(pdf_path, markdown_path)
-            files_generated.append(str(markdown_path))
-            
-            # Read the parsed markdown content
-            with open(markdown_path, 'r', encoding='utf-8') as f:
-                rfp_content = f.read()
+            files_generated.append(await parse)
             
             # Step 2: Extract information using LLM modules
             print("🔄 Step 2: Extracting information using LLM modules...")
+            files_generated.extend(await self.extract_stage(session_folder, progress, result_path, on_section))
             
-            # Import job manager for progress updates
-            try:
-                from ..job_manager import job_manager
-                # Find job_id from session_folder path if available
-                job_id = None
-                for jid, job in job_manager.jobs.items():
-                    if job.get('status') == 'processing':
-                        job_id = jid
-                        break
-                if job_id:
-                    job_manager.update_job(job_id, progress=30)
-            except:
-                pass
-            
-            extraction_tasks = [
-                self._extract_boq(rfp_content, session_folder),
-                self._extract_pq(rfp_content, session_folder), 
-                self._extract_tq(rfp_content, session_folder),
-                self._extract_summary(rfp_content, session_folder),
-                self._extract_payment_terms(rfp_content, session_folder)
-            ]
-            
-            extraction_results = await asyncio.gather(*extraction_tasks, return_exceptions=True)
-            
-            try:
-                if job_id:
-                    job_manager.update_job(job_id, progress=60)
-            except:
-                pass
-            
-            # Collect successful extractions
-            for result in extraction_results:
-                if isinstance(result, list):
-                    files_generated.extend(result)
-                elif isinstance(result, Exception):
-                    print(f"⚠️ Extraction error: {result}")
-            
-            # Step 3: Convert markdown files to Excel
+            # Step 3: Render every extraction into the combined workbook
             print("🔄 Step 3: Converting to Excel format...")
-            excel_tasks = [
-                self._convert_specific_to_excel(session_folder / "extracted" / "boq.md", 
-                                              session_folder / "excel" / "boq.xlsx", "boq"),
-                self._convert_specific_to_excel(session_folder / "extracted" / "prequalification.md",
-                                               session_folder / "excel" / "prequalification.xlsx", "pq"),
-                self._convert_specific_to_excel(session_folder / "extracted" / "technical_qualification.md",
-                                               session_folder / "excel" / "technical_qualification.xlsx", "tq"),
-                self._convert_specific_to_excel(session_folder / "extracted" / "summary.md",
-                                               session_folder / "excel" / "summary.xlsx", "summary"),
-                self._convert_specific_to_excel(session_folder / "extracted" / "payment_terms.md",
-                                               session_folder / "excel" / "payment_terms.xlsx", "payment")
-            ]
-            
-            excel_results = await asyncio.gather(*excel_tasks, return_exceptions=True)
-            
-            # Collect Excel files
-            for result in excel_results:
-                if isinstance(result, str):
-                    files_generated.append(result)
-                elif isinstance(result, Exception):
-                    print(f"⚠️ Excel conversion error: {result}")
+            files_generated.append(await self.render_stage(session_folder, result_path, progress))
             
             processing_time = time.time() - start_time
             
@@ -111,110 +169,276 @@ class RFPProcessor:
             
             return {
                 "files_generated": files_generated,
-                "processing_time": processing_time
+                "processing_time": processing_time,
+                "stage_seconds": progress.stage_seconds
             }
             
         except Exception as e:
             print(f"❌ Pipeline error: {e}")
             raise e
     
-    async def _parse_pdf_to_markdown(self, pdf_path: Path, output_path: Path):
-        """Parse PDF using Docling without models"""
+    async def parse_stage(self, pdf_path: Path, session_folder: Path, pdf_hash: str = None,
+                          progress: JobProgress = None) -> str:
+        """Parse the PDF into parsed/rfp.md unless that checkpoint exists"""
+        progress = progress or JobProgress()
+        markdown_path = session_folder / "parsed" / "rfp.md"
+        if markdown_path.exists():
+            print("♻️ Parsed markdown checkpoint found, skipping parse")
+            emit("stage", stage="parse", state="skipped")
+            progress.skip("parse")
+        else:
+            async with self.stages["parse"].slot():
+                progress.start("parse", unit="pages")
+                with timed("parse"):
+                    await self._parse_pdf_to_markdown(pdf_path, markdown_path, pdf_hash, progress)
+                progress.finish("parse")
+        return str(markdown_path)
+    
+    async def parse_documents_stage(self, documents: list, session_folder: Path,
+                                    progress: JobProgress = None) -> str:
+        """Parse every PDF of a package and merge them into parsed/rfp.md unless that checkpoint exists.
+
+        Each PDF waits for a parse worker of its own, so the package is
+        parsed as concurrently as PARSE_CONCURRENCY allows. Every PDF's
+        markdown (parsed/documents/{n}.md) is a checkpoint as well, so a
+        resumed job only parses the PDFs it had not finished.
+        """
+        progress = progress or JobProgress()
+        markdown_path = session_folder / "parsed" / "rfp.md"
+        if markdown_path.exists():
+            print("♻️ Parsed markdown checkpoint found, skipping parse")
+            emit("stage", stage="parse", state="skipped")
+            progress.skip("parse")
+            return str(markdown_path)
+        
+        parts_folder = session_folder / "parsed" / "documents"
+        parts_folder.mkdir(parents=True, exist_ok=True)
+        parts = [parts_folder / f"{index}.md" for index in range(len(documents))]
+        
+        def count_all():
+            counts = []
+            for (_, pdf_path, _), part in zip(documents, parts):
+                try:
+                    counts.append(0 if part.exists() else count_pages(pdf_path))
+                except Exception:
+                    counts.append(0)
+            return counts
+        
+        page_counts = await asyncio.to_thread(count_all)
+        progress.start("parse", total=sum(page_counts), unit="pages")
+        
+        async def parse_one(pdf_path: Path, pdf_hash: str, part: Path, pages: int):
+            if part.exists():
+                return
+            async with self.stages["parse"].slot():
+                with timed("parse"):
+                    await self._parse_pdf_to_markdown(pdf_path, part, pdf_hash, progress, pages)
+        
+        await asyncio.gather(*(parse_one(pdf_path, pdf_hash, part, pages) for (_, pdf_path, pdf_hash), part, pages
+                               in zip(documents, parts, page_counts)))
+        
+        def merge_sync():
+            merged = []
+            for (label, _, _), part in zip(documents, parts):
+                with open(part, 'r', encoding='utf-8') as f:
+                    merged.append((label, f.read()))
+            write_atomic(markdown_path, merge_documents(merged))
+        
+        await asyncio.to_thread(merge_sync)
+        progress.finish("parse")
+        return str(markdown_path)
+    
+    async def extract_stage(self, session_folder: Path, progress: JobProgress = None, result_path: Path = None,
+                            on_section: Callable[[str, str], None] = None) -> list:
+        """Run every extractor over the parsed markdown; returns the files written.
+
+        With on_section, each section's own workbook is rendered as soon as
+        its extractor succeeds (see process_rfp).
+        """
+        with open(session_folder / "parsed" / "rfp.md", 'r', encoding='utf-8') as f:
+            rfp_content = f.read()
+        
+        progress = progress or JobProgress()
+        async with self.stages["extract"].slot():
+            # Hand each extractor only the sections relevant to its topic
+            with timed("route"):
+                contexts = await asyncio.to_thread(route_context, rfp_content)
+            
+            extractions = [
+                self._extract_boq(contexts["boq"], session_folder),
+                self._extract_pq(contexts["pq"], session_folder),
+                self._extract_tq(contexts["tq"], session_folder),
+                self._extract_summary(contexts["summary"], session_folder),
+                self._extract_payment_terms(contexts["payment"], session_folder)
+            ]
+            progress.start("extract", total=len(extractions), unit="extractors")
+            
+            async def counted(extraction):
+                try:
+                    files = await extraction
+                finally:
+                    progress.step()
+                if files and on_section:
+                    await self._publish_section(Path(files[0]), result_path, on_section)
+                return files
+            
+            extraction_results = await asyncio.gather(
+                *(counted(extraction) for extraction in extractions), return_exceptions=True
+            )
+            progress.finish("extract")
+        
+        # Collect successful extractions
+        files = []
+        for result in extraction_results:
+            if isinstance(result, list):
+                files.extend(result)
+            elif isinstance(result, Exception):
+                print(f"⚠️ Extraction error: {result}")
+        return files
+    
+    async def _publish_section(self, markdown_path: Path, result_path: Path, on_section: Callable[[str, str], None]):
+        """Render one extracted section into its own workbook (unless an earlier attempt did) and announce it"""
+        section = markdown_path.stem
+        sheet_name, render = SECTIONS[section]
+        section_path = section_result_path(result_path, section)
+        
+        def render_sync():
+            with open(markdown_path, 'r', encoding='utf-8') as f:
+                document = parse_markdown(f.read())
+            partial = partial_path(section_path)
+            with timed("section", sheet_name):
+                save_single_sheet(render, document, str(partial), sheet_name)
+            os.replace(partial, section_path)
+        
+        try:
+            if not section_path.exists():
+                section_path.parent.mkdir(parents=True, exist_ok=True)
+                await asyncio.to_thread(render_sync)
+            on_section(section, str(section_path))
+        except Exception as e:
+            # The combined workbook still gets this section; only the early download is lost
+            print(f"⚠️ Could not publish {section} early: {e}")
+    
+    async def render_stage(self, session_folder: Path, result_path: Path, progress: JobProgress = None) -> str:
+        """Render the workbook unless a completed one is already in place"""
+        progress = progress or JobProgress()
+        if Path(result_path).exists():
+            print("♻️ Workbook checkpoint found, skipping render")
+            emit("stage", stage="render", state="skipped")
+            progress.skip("render")
+            return str(result_path)
+        async with self.stages["render"].slot():
+            progress.start("render", unit="sheets")
+            workbook = await self.render_workbook(session_folder, result_path, progress)
+            progress.finish("render")
+            return workbook
+    
+    async def _parse_pdf_to_markdown(self, pdf_path: Path, output_path: Path, pdf_hash: str = None,
+                                     progress: JobProgress = None, page_count: int = None):
+        """Parse PDF using Docling, reusing cached output for identical PDFs.
+
+        page_count is given when the caller already counted this PDF's pages
+        into progress's total (one of several PDFs parsed together).
+        """
         def parse_sync():
-            from docling.document_converter import DocumentConverter
+            pages = page_count
+            if pages is None:
+                try:
+                    pages = count_pages(pdf_path)
+                except Exception:
+                    pages = 0
+                if progress and pages:
+                    progress.set_total(pages, "pages")
+            stepped = False
+            # 0: counting failed, let the parser try for itself
+            sharded = self.sharded_parser.should_shard(pdf_path, pages or None)
+            options = self.sharded_parser.options if sharded else DOCLING_OPTIONS
+            cache_key = parse_cache.make_key(pdf_hash or hash_file(pdf_path), options)
+            markdown = parse_cache.get(cache_key)
+            if markdown is not None:
+                print("♻️ Parse cache hit, skipping Docling conversion")
+            else:
+                if sharded:
+                    markdown = self.sharded_parser.parse(pdf_path, on_pages=progress.step if progress else None,
+                                                         page_count=pages or None)
+                    stepped = progress is not None
+                else:
+                    with self.converter_pool.acquire() as converter:
+                        result = converter.convert(str(pdf_path))
+                    markdown = result.document.export_to_markdown()
+                parse_cache.put(cache_key, markdown)
 
-            converter = DocumentConverter()
-            result = converter.convert(str(pdf_path))
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(result.document.export_to_markdown())
+            if progress and pages and not stepped:
+                progress.step(pages)
+            write_atomic(output_path, markdown)
             return str(output_path)
         
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, parse_sync)
     
+    async def _checkpointed(self, extract, rfp_content: str, output_path: Path) -> list:
+        """Run one extractor unless its output survived an earlier attempt.
+
+        The extractor writes to a partial file that is renamed into place
+        only on success, so an interrupted run never leaves a truncated
+        checkpoint behind.
+        """
+        if output_path.exists():
+            print(f"♻️ {output_path.name} checkpoint found, skipping extraction")
+            emit("extractor", name=output_path.stem, state="skipped")
+            return [str(output_path)]
+        partial = partial_path(output_path)
+        with timed("extract", output_path.stem):
+            if not await extract(rfp_content, str(partial)):
+                emit("extractor", name=output_path.stem, state="failed")
+                return []
+        os.replace(partial, output_path)
+        emit("extractor", name=output_path.stem, state="completed")
+        return [str(output_path)]
+    
     async def _extract_boq(self, rfp_content: str, session_folder: Path) -> list:
         """Extract Bill of Quantities"""
-        def extract_sync():
-            output_path = session_folder / "extracted" / "boq.md"
-            success = extract_boq_criteria(rfp_content, str(output_path))
-            return [str(output_path)] if success else []
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, extract_sync)
+        output_path = session_folder / "extracted" / "boq.md"
+        return await self._checkpointed(extract_boq_criteria_async, rfp_content, output_path)
     
     async def _extract_pq(self, rfp_content: str, session_folder: Path) -> list:
         """Extract Prequalification criteria"""
-        def extract_sync():
-            output_path = session_folder / "extracted" / "prequalification.md"
-            success = extract_prequalification_criteria(rfp_content, str(output_path))
-            return [str(output_path)] if success else []
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, extract_sync)
+        output_path = session_folder / "extracted" / "prequalification.md"
+        return await self._checkpointed(extract_prequalification_criteria_async, rfp_content, output_path)
     
     async def _extract_tq(self, rfp_content: str, session_folder: Path) -> list:
         """Extract Technical Qualification criteria"""
-        def extract_sync():
-            output_path = session_folder / "extracted" / "technical_qualification.md"
-            success = extract_pure_technical_qualification(rfp_content, str(output_path))
-            return [str(output_path)] if success else []
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, extract_sync)
+        output_path = session_folder / "extracted" / "technical_qualification.md"
+        return await self._checkpointed(extract_pure_technical_qualification_async, rfp_content, output_path)
     
     async def _extract_summary(self, rfp_content: str, session_folder: Path) -> list:
         """Extract RFP summary"""
-        def extract_sync():
-            output_path = session_folder / "extracted" / "summary.md"
-            success = extract_rfp_key_details(rfp_content, str(output_path))
-            return [str(output_path)] if success else []
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, extract_sync)
+        output_path = session_folder / "extracted" / "summary.md"
+        return await self._checkpointed(extract_rfp_key_details_async, rfp_content, output_path)
     
     async def _extract_payment_terms(self, rfp_content: str, session_folder: Path) -> list:
         """Extract Payment Terms"""
-        def extract_sync():
-            output_path = session_folder / "extracted" / "payment_terms.md"
-            result = extract_payment_terms(rfp_content, str(output_path))
-            return [str(output_path)] if result else []
-        
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, extract_sync)
+        output_path = session_folder / "extracted" / "payment_terms.md"
+        return await self._checkpointed(extract_payment_terms_async, rfp_content, output_path)
     
-    async def _convert_specific_to_excel(self, markdown_path: Path, excel_path: Path, converter_type: str) -> str:
-        """Convert markdown to Excel using specific converters"""
-        def convert_sync():
-            if not markdown_path.exists():
-                return None
-            
-            try:
-                if converter_type == "boq":
-                    from ..excel_convertor.boq_to_excel import create_boq_excel
-                    create_boq_excel(str(markdown_path), str(excel_path))
-                elif converter_type == "pq":
-                    from ..excel_convertor.pq_to_excel import create_prequalification_excel
-                    create_prequalification_excel(str(markdown_path), str(excel_path))
-                elif converter_type == "tq":
-                    from ..excel_convertor.pure_tq_to_excel import create_tq_excel
-                    create_tq_excel(str(markdown_path), str(excel_path))
-                elif converter_type == "summary":
-                    from ..excel_convertor.rfp_summary_to_excel import create_rfp_excel
-                    create_rfp_excel(str(markdown_path), str(excel_path))
-                elif converter_type == "payment":
-                    from ..excel_convertor.payment_terms_to_excel import create_payment_terms_excel
-                    create_payment_terms_excel(str(markdown_path), str(excel_path))
-                else:
-                    # Use utils converter as fallback
-                    from .utils import convert_markdown_to_excel
+    async def render_workbook(self, session_folder: Path, result_path: Path, progress: JobProgress = None) -> str:
+        """Render the extracted markdown straight into one workbook, one sheet per section"""
+        def render_sync():
+            sheets = []
+            for sheet_name, filename, render in WORKBOOK_SHEETS:
+                markdown_path = session_folder / "extracted" / filename
+                if markdown_path.exists():
                     with open(markdown_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    convert_markdown_to_excel(content, excel_path, "Data")
-                
-                return str(excel_path)
-            except Exception as e:
-                print(f"Excel conversion error for {converter_type}: {e}")
-                return None
+                        sheets.append((sheet_name, _timed_render(sheet_name, render, progress),
+                                       parse_markdown(f.read())))
+            if progress:
+                progress.set_total(len(sheets), "sheets")
+            # Renamed into place once complete, so its presence marks the render stage done
+            partial = partial_path(Path(result_path))
+            with timed("workbook"):
+                save_workbook(sheets, str(partial))
+            os.replace(partial, result_path)
+            return str(result_path)
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, convert_sync)
\ No newline at end of file
+        # to_thread carries the job's metrics context into the render thread
+        return await asyncio.to_thread(render_sync)
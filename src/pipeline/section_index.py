@@ -0,0 +1,193 @@
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from ..llm_extractor.chunking import estimate_tokens, is_table_line, split_blocks, split_table
+
+load_dotenv()
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+\S')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Opens each source PDF's part of a merged multi-document markdown
+DOCUMENT_MARKER = "<!-- document: {} -->"
+DOCUMENT_PATTERN = re.compile(r'^<!-- document: (.+) -->$')
+
+# Lexical queries describing what each extractor looks for
+TOPIC_QUERIES = {
+    "boq": "bill of quantities boq schedule of items price schedule quantity qty unit rate item description "
+           "manpower resources equipment material cost financial bid annexure",
+    "pq": "pre qualification prequalification eligibility criteria mandatory minimum qualification turnover "
+          "experience similar projects certificate consortium jv rejection checklist declaration emd deadline",
+    "tq": "technical qualification evaluation scoring score marks points maximum criteria scoring mechanism "
+          "supporting documents technical competence presentation methodology",
+    "summary": "project name document title client tender notice purpose contact date time bid submission "
+               "pre bid meeting venue document fee emd earnest money opening website duration scope of work "
+               "evaluation method",
+    "payment": "payment terms schedule milestones advance payment retention holdback penalty penalties "
+               "liquidated damages deductions invoice performance bank guarantee security deposit sla",
+}
+
+
+def _tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def merge_documents(documents: List[Tuple[str, str]]) -> str:
+    """One markdown from several (label, markdown) documents, each opened by its DOCUMENT_MARKER"""
+    return '\n\n'.join(f"{DOCUMENT_MARKER.format(label)}\n\n{markdown.strip()}" for label, markdown in documents)
+
+
+@dataclass
+class Section:
+    position: int
+    heading: str
+    text: str
+    tokens: int = 0
+    terms: Counter = field(default_factory=Counter)
+    # Source PDF in a merged multi-document markdown
+    document: Optional[str] = None
+
+
+class SectionIndex:
+    """BM25 index over heading-delimited sections of a Docling markdown document.
+
+    In a merged document (see merge_documents) every section remembers the
+    PDF it came from, and the selected context repeats the document marker
+    wherever the source changes.
+    """
+
+    def __init__(self, markdown: str, max_section_tokens: int = 2000, k1: float = 1.5, b: float = 0.75):
+        self.markdown = markdown
+        self.max_section_tokens = max_section_tokens
+        self.k1 = k1
+        self.b = b
+        self.sections = self._build_sections(markdown)
+        self.total_tokens = estimate_tokens(markdown)
+
+        self.doc_freq = Counter()
+        for section in self.sections:
+            self.doc_freq.update(section.terms.keys())
+        lengths = [sum(section.terms.values()) for section in self.sections]
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+
+    def _build_sections(self, markdown: str) -> List[Section]:
+        raw_sections, heading, lines, document = [], "", [], None
+        for line in markdown.split('\n'):
+            marker = DOCUMENT_PATTERN.match(line)
+            if marker or HEADING_PATTERN.match(line):
+                if heading or any(l.strip() for l in lines):
+                    raw_sections.append((heading, lines, document))
+                if marker:
+                    # A new source document never continues the previous one's section
+                    heading, lines, document = "", [], marker.group(1)
+                else:
+                    heading, lines = line.lstrip('#').strip(), [line]
+            else:
+                lines.append(line)
+        if heading or any(l.strip() for l in lines):
+            raw_sections.append((heading, lines, document))
+
+        sections = []
+        for heading, lines, document in raw_sections:
+            for text in self._bounded_pieces(lines):
+                # Heading terms count twice: titles are the strongest topic signal
+                terms = Counter(_tokenize(text) + _tokenize(heading))
+                sections.append(Section(len(sections), heading, text, estimate_tokens(text), terms, document))
+        return sections
+
+    def _bounded_pieces(self, lines: List[str]) -> List[str]:
+        """Split a section into pieces under max_section_tokens without breaking tables"""
+        text = '\n'.join(lines).strip()
+        if estimate_tokens(text) <= self.max_section_tokens:
+            return [text]
+
+        pieces, current, current_tokens = [], [], 0
+        for block in split_blocks(lines):
+            if is_table_line(block[0]) and estimate_tokens('\n'.join(block)) > self.max_section_tokens:
+                parts = split_table(block, self.max_section_tokens)
+            else:
+                parts = [block]
+            for part in parts:
+                part_text = '\n'.join(part)
+                part_tokens = estimate_tokens(part_text)
+                if current and current_tokens + part_tokens > self.max_section_tokens:
+                    pieces.append('\n\n'.join(current))
+                    current, current_tokens = [], 0
+                current.append(part_text)
+                current_tokens += part_tokens
+        if current:
+            pieces.append('\n\n'.join(current))
+        return pieces
+
+    def score(self, query: str) -> List[float]:
+        """BM25 score of every section for the query"""
+        query_terms = set(_tokenize(query))
+        total = len(self.sections)
+        scores = []
+        for section in self.sections:
+            length = sum(section.terms.values())
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length) if self.avg_length else self.k1
+            value = 0.0
+            for term in query_terms:
+                tf = section.terms.get(term, 0)
+                if not tf:
+                    continue
+                df = self.doc_freq[term]
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                value += idf * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(value)
+        return scores
+
+    def select(self, query: str, token_budget: int) -> str:
+        """Highest-scoring sections that fit the budget, in document order"""
+        if self.total_tokens <= token_budget:
+            return self.markdown
+
+        scores = self.score(query)
+        ranked = sorted(
+            (section for section in self.sections if scores[section.position] > 0),
+            key=lambda section: scores[section.position],
+            reverse=True
+        )
+
+        # The leading section carries the title/notice block every extractor benefits from
+        chosen, used = set(), 0
+        if self.sections and self.sections[0].tokens <= token_budget:
+            chosen.add(0)
+            used += self.sections[0].tokens
+        for section in ranked:
+            if section.position in chosen or used + section.tokens > token_budget:
+                continue
+            chosen.add(section.position)
+            used += section.tokens
+
+        parts, document = [], None
+        for position in sorted(chosen):
+            section = self.sections[position]
+            if section.document is not None and section.document != document:
+                parts.append(DOCUMENT_MARKER.format(section.document))
+                document = section.document
+            parts.append(section.text)
+        return '\n\n'.join(parts)
+
+    def route(self, token_budget: int) -> Dict[str, str]:
+        """Context for every extractor topic"""
+        return {topic: self.select(query, token_budget) for topic, query in TOPIC_QUERIES.items()}
+
+
+def route_context(markdown: str) -> Dict[str, str]:
+    """Per-extractor context, or the full document for every topic when routing is disabled"""
+    if os.getenv("CONTEXT_ROUTING_ENABLED", "true").lower() != "true":
+        return {topic: markdown for topic in TOPIC_QUERIES}
+
+    token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", 60000))
+    index = SectionIndex(markdown)
+    routed = index.route(token_budget)
+    for topic, context in routed.items():
+        print(f"🧭 {topic}: routed {estimate_tokens(context)} of {index.total_tokens} tokens")
+    return routed
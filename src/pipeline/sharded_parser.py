@@ -0,0 +1,181 @@
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Converter built once per pool process and reused for every shard it handles
+_worker_converter = None
+
+SEPARATOR_PATTERN = re.compile(r'^\|[-:\s|]+\|$')
+
+
+def count_pages(pdf_path) -> int:
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(str(pdf_path))
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def plan_shards(page_count: int, shard_pages: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into consecutive (start, end) page ranges"""
+    return [(start, min(start + shard_pages, page_count)) for start in range(0, page_count, shard_pages)]
+
+
+def _init_worker(threads: int):
+    # Runs before docling/torch are imported in the child, so the limit sticks
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+
+def _convert_shard(pdf_path: str, start: int, end: int, work_dir: str) -> str:
+    """Process-pool entry point: cut pages [start, end) out of the PDF and convert them"""
+    global _worker_converter
+    import pypdfium2 as pdfium
+
+    shard_path = Path(work_dir) / f"shard_{start:05d}_{end:05d}.pdf"
+    source = pdfium.PdfDocument(pdf_path)
+    shard = pdfium.PdfDocument.new()
+    try:
+        shard.import_pages(source, list(range(start, end)))
+        shard.save(str(shard_path))
+    finally:
+        shard.close()
+        source.close()
+
+    if _worker_converter is None:
+        from docling.document_converter import DocumentConverter
+        _worker_converter = DocumentConverter()
+
+    try:
+        result = _worker_converter.convert(str(shard_path))
+        return result.document.export_to_markdown()
+    finally:
+        shard_path.unlink(missing_ok=True)
+
+
+def _is_table_row(line: str) -> bool:
+    line = line.strip()
+    return line.startswith('|') and line.endswith('|') and len(line) > 1
+
+
+def _cells(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip()[1:-1].split('|')]
+
+
+def _join_shards(left: str, right: str) -> str:
+    """Concatenate two shard outputs, merging a table split across the boundary"""
+    left_lines = left.rstrip('\n').split('\n')
+    right_lines = right.lstrip('\n').split('\n')
+
+    if not (left_lines and right_lines and _is_table_row(left_lines[-1]) and _is_table_row(right_lines[0])):
+        return left.rstrip('\n') + '\n\n' + right.lstrip('\n')
+
+    column_count = len(_cells(left_lines[-1]))
+    if len(_cells(right_lines[0])) != column_count:
+        return left.rstrip('\n') + '\n\n' + right.lstrip('\n')
+
+    # Walk back to the header of the table that ends the left shard
+    table_start = len(left_lines) - 1
+    while table_start > 0 and _is_table_row(left_lines[table_start - 1]):
+        table_start -= 1
+    header = _cells(left_lines[table_start])
+
+    continuation = right_lines
+    if len(continuation) > 1 and SEPARATOR_PATTERN.match(continuation[1].strip()):
+        if _cells(continuation[0]) == header:
+            # Header repeated on the new page
+            continuation = continuation[2:]
+        else:
+            # Docling promoted the first continued row to a header
+            continuation = [continuation[0]] + continuation[2:]
+
+    return '\n'.join(left_lines + continuation)
+
+
+def stitch_shards(parts: List[str]) -> str:
+    """Join shard markdown in page order"""
+    parts = [part for part in parts if part.strip()]
+    if not parts:
+        return ""
+    markdown = parts[0]
+    for part in parts[1:]:
+        markdown = _join_shards(markdown, part)
+    return markdown
+
+
+class ShardedParser:
+    """Converts large PDFs as page-range shards in a process pool"""
+
+    def __init__(self):
+        self.mode = os.getenv("DOCLING_PARSE_MODE", "auto").lower()
+        self.shard_pages = max(1, int(os.getenv("DOCLING_SHARD_PAGES", 50)))
+        self.min_pages = int(os.getenv("DOCLING_SHARD_MIN_PAGES", 150))
+        self.workers = max(1, int(os.getenv("DOCLING_PARSE_WORKERS", min(os.cpu_count() or 1, 4))))
+        self._executor = None
+
+    @property
+    def options(self) -> str:
+        return f"sharded:{self.shard_pages}"
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # spawn: forking a process that already holds torch thread pools can deadlock
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads,)
+            )
+        return self._executor
+
+    def should_shard(self, pdf_path, page_count: int = None) -> bool:
+        """page_count saves opening the PDF again when the caller already counted it"""
+        if self.mode == "single":
+            return False
+        if self.mode == "sharded":
+            return True
+        if page_count is not None:
+            return page_count >= self.min_pages
+        try:
+            return count_pages(pdf_path) >= self.min_pages
+        except Exception as e:
+            print(f"⚠️ Could not count PDF pages, parsing unsharded: {e}")
+            return False
+
+    def parse(self, pdf_path, on_pages: Callable[[int], None] = None, page_count: int = None) -> str:
+        """Convert the PDF shard by shard and stitch the markdown back together.
+
+        on_pages(n) is called, from a pool callback thread, as each shard of
+        n pages finishes. page_count is counted here unless given.
+        """
+        if page_count is None:
+            page_count = count_pages(pdf_path)
+        shards = plan_shards(page_count, self.shard_pages)
+        print(f"🔀 Parsing {page_count} pages as {len(shards)} shard(s) on {self.workers} process(es)")
+
+        with tempfile.TemporaryDirectory(prefix="docling_shards_") as work_dir:
+            futures = [
+                self.executor.submit(_convert_shard, str(pdf_path), start, end, work_dir)
+                for start, end in shards
+            ]
+            if on_pages:
+                for future, (start, end) in zip(futures, shards):
+                    future.add_done_callback(lambda _, pages=end - start: on_pages(pages))
+            parts = [future.result() for future in futures]
+
+        return stitch_shards(parts)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+
+from ..events import emit
+
+load_dotenv()
+
+# Worker count of each pipeline stage: (env variable, default)
+STAGE_WORKERS = {
+    "parse": ("PARSE_CONCURRENCY", 1),
+    "extract": ("LLM_CONCURRENCY", 2),
+    "render": ("RENDER_CONCURRENCY", 1)
+}
+
+
+def stage_workers(name: str) -> int:
+    env, default = STAGE_WORKERS[name]
+    return max(1, int(os.getenv(env, default)))
+
+
+class Stage:
+    """One pipeline stage: a FIFO line of jobs in front of a fixed number of workers.
+
+    A job holds a worker only while it is inside the stage, so while one
+    job waits on LLM calls in extract the next one can already be parsing.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self._slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.busy = 0
+        self.completed = 0
+        self.busy_seconds = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Wait in line for a worker of this stage and hold it for the body"""
+        emit("stage", stage=self.name, state="waiting")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.busy += 1
+        started = time.time()
+        emit("stage", stage=self.name, state="started")
+        try:
+            yield
+        finally:
+            self.busy -= 1
+            self.completed += 1
+            self.busy_seconds += time.time() - started
+            self._slots.release()
+        emit("stage", stage=self.name, state="completed")
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "busy": self.busy,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "average_seconds": round(self.busy_seconds / self.completed, 1) if self.completed else None
+        }
+
+
+# Shared by every job in this worker process
+stages = {name: Stage(name, stage_workers(name)) for name in STAGE_WORKERS}
+
+
+def jobs_in_flight() -> int:
+    """Enough jobs admitted at once for every stage worker to be busy with a different job"""
+    return sum(stage.workers for stage in stages.values())
@@ -5,6 +5,8 @@ from typing import Dict, Any
 import pandas as pd
 import re
 
+from ..markdown_parser import parse_markdown
+
 def create_folder_structure(session_id: str, timestamp: str) -> Path:
     """Create organized folder structure for processing session"""
     base_path = Path("output") / session_id
@@ -21,6 +23,17 @@ def create_folder_structure(session_id: str, timestamp: str) -> Path:
     
     return base_path
 
+def partial_path(path: Path) -> Path:
+    """Sibling path a checkpoint is written to before being renamed into place"""
+    return path.with_name(path.name + ".partial")
+
+def write_atomic(path: Path, content: str):
+    """Write a text checkpoint so that it either exists complete or not at all"""
+    partial = partial_path(path)
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(partial, path)
+
 def cleanup_temp_files(session_folder: Path):
     """Clean up temporary files and folders"""
     if session_folder.exists():
@@ -62,46 +75,11 @@ def convert_markdown_to_excel(markdown_content: str, output_path: Path, sheet_na
 
 def extract_tables_from_markdown(content: str) -> list:
     """Extract tables from markdown content"""
-    tables = []
-    lines = content.split('\n')
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Check if line contains table separator
-        if '|' in line and i + 1 < len(lines):
-            next_line = lines[i + 1].strip()
-            
-            # Check if next line is a separator (contains dashes)
-            if '|' in next_line and '-' in next_line:
-                # Found a table
-                headers = [col.strip() for col in line.split('|')[1:-1]]
-                
-                # Skip separator line
-                i += 2
-                
-                # Collect table rows
-                rows = []
-                while i < len(lines):
-                    row_line = lines[i].strip()
-                    if '|' in row_line and row_line:
-                        row = [col.strip() for col in row_line.split('|')[1:-1]]
-                        if len(row) == len(headers):
-                            rows.append(row)
-                        i += 1
-                    else:
-                        break
-                
-                if rows:
-                    df = pd.DataFrame(rows, columns=headers)
-                    tables.append(df)
-                
-                continue
-        
-        i += 1
-    
-    return tables
+    return [
+        pd.DataFrame(table.rows, columns=table.header)
+        for table in parse_markdown(content).tables
+        if table.rows
+    ]
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file operations"""
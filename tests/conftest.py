@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Modules live at the repository root (job_store, recovery) and under src/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Importing job_store opens its module-level store; keep it out of /home/site
+os.environ.setdefault("JOB_STORE_DB", os.path.join(tempfile.mkdtemp(prefix="rfp_tests_"), "jobs.db"))
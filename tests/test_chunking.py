@@ -0,0 +1,51 @@
+from src.llm_extractor.chunking import estimate_tokens, merge_extractions, split_into_chunks
+
+
+def test_chunks_stay_within_budget_and_keep_tables_whole():
+    table = "| Item | Qty |\n|---|---|\n| Cable | 10 |\n| Pipe | 4 |"
+    markdown = "\n\n".join(["intro " * 20, table, "closing " * 20])
+    chunks = split_into_chunks(markdown, max_tokens=50)
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+    assert any(table in chunk for chunk in chunks)
+
+
+def test_oversized_table_is_split_with_its_header_repeated():
+    rows = "\n".join(f"| Item {index} | {index} |" for index in range(40))
+    chunks = split_into_chunks(f"| Item | Qty |\n|---|---|\n{rows}", max_tokens=60)
+    assert len(chunks) > 1
+    assert all(chunk.startswith("| Item | Qty |\n|---|---|") for chunk in chunks)
+
+
+def test_consecutive_chunks_share_trailing_blocks():
+    paragraphs = [f"paragraph {index} " + "word " * 10 for index in range(6)]
+    chunks = split_into_chunks("\n\n".join(paragraphs), max_tokens=40, overlap_tokens=20)
+    assert len(chunks) > 1
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.split("\n\n")[0] == previous.split("\n\n")[-1]
+
+
+def test_merge_concatenates_tables_and_drops_duplicate_rows():
+    first = "## Bill of Quantities\n\n| Item | Qty |\n|---|---|\n| Cable | 10 |\n| Pipe | 4 |"
+    second = "## Bill of Quantities\n\n| Item | Qty |\n|---|---|\n| Pipe | 4 |\n| Valve | 2 |"
+    assert merge_extractions([first, second]) == (
+        "## Bill of Quantities\n\n| Item | Qty |\n|---|---|\n| Cable | 10 |\n| Pipe | 4 |\n| Valve | 2 |\n"
+    )
+
+
+def test_merge_prefers_a_real_value_over_a_placeholder_row():
+    first = "| Criterion | Requirement |\n|---|---|\n| Turnover | Not specified |"
+    second = "| Criterion | Requirement |\n|---|---|\n| Turnover | INR 5 crore |"
+    merged = merge_extractions([first, second])
+    assert "| Turnover | INR 5 crore |" in merged
+    assert "Not specified" not in merged
+
+
+def test_merge_aligns_fixed_section_titles_and_drops_repeated_lines():
+    titles = ["1. Payment Schedule / Milestones", "2. Advance Payment"]
+    first = "1. Payment Schedule / Milestones\n- 90% on delivery\n\n2. Advance Payment\nNo advance payment."
+    second = "1. Payment Schedule / Milestones\n- 90% on delivery\n- 10% on commissioning"
+    merged = merge_extractions([first, second], titles)
+    assert merged == (
+        "1. Payment Schedule / Milestones\n\n- 90% on delivery\n\n- 10% on commissioning\n\n"
+        "2. Advance Payment\n\nNo advance payment.\n"
+    )
@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+from src.events import EventBus, format_sse
+
+
+def test_history_replays_events_after_last_event_id():
+    async def main():
+        bus = EventBus()
+        for percent in (10, 20, 30):
+            bus.publish("job", "progress", {"percent": percent})
+        first = bus.history("job")[0]["id"]
+        return [record["data"]["percent"] for record in bus.history("job", after=first)]
+
+    assert asyncio.run(main()) == [20, 30]
+
+
+def test_stalled_subscriber_loses_oldest_events():
+    async def main():
+        bus = EventBus(history=2)
+        queue = bus.subscribe("job")
+        for percent in (10, 20, 30):
+            bus.publish("job", "progress", {"percent": percent})
+        received = [queue.get_nowait()["data"]["percent"] for _ in range(queue.qsize())]
+        bus.unsubscribe("job", queue)
+        return received, bus.stats()
+
+    received, stats = asyncio.run(main())
+    assert received == [20, 30]
+    assert stats == {"jobs_with_history": 1, "subscribers": 0}
+
+
+def test_history_is_dropped_after_the_final_status():
+    async def main():
+        bus = EventBus(linger_seconds=0.01)
+        bus.publish("job", "status", {"status": "processing"})
+        bus.publish("job", "status", {"status": "failed"})
+        await asyncio.sleep(0.05)
+        return bus.history("job")
+
+    assert asyncio.run(main()) == []
+
+
+def test_format_sse():
+    record = {"id": 7, "event": "status", "data": {"status": "completed"}}
+    assert format_sse(record) == 'id: 7\nevent: status\ndata: {"status": "completed"}\n\n'
+    # Snapshots carry no id, so reconnecting clients keep their Last-Event-ID
+    snapshot = format_sse({"id": None, "event": "snapshot", "data": {"percent": 50}})
+    assert snapshot.splitlines()[0] == "event: snapshot"
+    assert json.loads(snapshot.splitlines()[1][len("data: "):]) == {"percent": 50}
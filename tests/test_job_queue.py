@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from src.pipeline.job_queue import JobQueue, QueueClosed, QueueFull
+
+
+def run_queue(submissions, workers=1, max_depth=20):
+    """Submit (job_id, group) pairs to a fresh queue and return the order its workers ran them"""
+    async def main():
+        queue = JobQueue(workers=workers, max_depth=max_depth)
+        ran = []
+        done = asyncio.Event()
+
+        async def handler(job_id):
+            ran.append(job_id)
+            if len(ran) == len(submissions):
+                done.set()
+
+        queue.start(handler)
+        # Workers only run once this coroutine yields, so everything below is queued first
+        for job_id, group in submissions:
+            await queue.submit(job_id, force=True, group=group)
+        await asyncio.wait_for(done.wait(), 5)
+        await queue.stop()
+        return ran
+
+    return asyncio.run(main())
+
+
+def test_groups_take_turns():
+    submissions = [("b1", "batch"), ("b2", "batch"), ("b3", "batch"), ("single", None), ("b4", "batch")]
+    assert run_queue(submissions) == ["b1", "single", "b2", "b3", "b4"]
+
+
+def test_position_follows_dispatch_order():
+    async def main():
+        queue = JobQueue(workers=1)
+        queue.start(lambda job_id: asyncio.sleep(0))
+        for job_id, group in [("b1", "batch"), ("b2", "batch"), ("x", None), ("y", None)]:
+            await queue.submit(job_id, force=True, group=group)
+        snapshot = queue._dispatch_order(), queue.position("b2"), queue.position("gone"), queue.stats()["groups"]
+        await queue.stop()
+        return snapshot
+
+    order, position, missing, groups = asyncio.run(main())
+    assert order == ["b1", "x", "y", "b2"]
+    assert position == 4
+    assert missing is None
+    assert groups == 3
+
+
+def test_admission_counts_groups_not_jobs():
+    async def main():
+        queue = JobQueue(workers=1, max_depth=2)
+        queue.start(lambda job_id: asyncio.sleep(0))
+        # A batch of five is one group: one single upload still fits
+        for index in range(5):
+            await queue.submit(f"b{index}", force=True, group="batch")
+        await queue.submit("single")
+        with pytest.raises(QueueFull):
+            queue.check_admission()
+        await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_submit_refused_before_start():
+    with pytest.raises(QueueClosed):
+        asyncio.run(JobQueue(workers=1).submit("job"))
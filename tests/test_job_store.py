@@ -0,0 +1,52 @@
+import time
+
+import pytest
+
+from job_store import JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(db_path=str(tmp_path / "jobs.db"))
+
+
+def test_update_job_if_only_applies_when_expected_fields_match(store):
+    store.create_job("batch", "package.zip", kind="batch", consolidating=False)
+    assert store.update_job_if("batch", {"consolidating": False}, consolidating=True, owner="a")
+    # The second worker to see the last child finish loses the claim
+    assert not store.update_job_if("batch", {"consolidating": False}, consolidating=True, owner="b")
+    assert store.get_job("batch")["owner"] == "a"
+    assert not store.update_job_if("missing", {}, status="failed")
+
+
+def test_finish_job_clears_eta_and_consolidation_claim(store):
+    store.create_job("job", "rfp.pdf", progress={"percent": 40.0, "eta_seconds": 90}, consolidating=True)
+    job = store.finish_job("job", "failed", error="boom")
+    assert job["status"] == "failed"
+    assert job["progress"] == {"percent": 40.0, "eta_seconds": None}
+    assert job["consolidating"] is False
+    assert store.get_job("job")["error"] == "boom"
+    assert store.recent_jobs("failed")[0]["id"] == "job"
+
+
+def test_claim_orphaned_jobs_skips_live_owners(store):
+    store.heartbeat("live")
+    store.create_job("mine", "a.pdf", status="processing", owner="live")
+    store.create_job("orphan", "b.pdf", status="queued", owner="dead")
+    store.create_job("done", "c.pdf", status="completed", owner="dead")
+
+    claimed = store.claim_orphaned_jobs("new", stale_after=60)
+    assert [job["id"] for job in claimed] == ["orphan"]
+    assert claimed[0]["resumes"] == 1
+    assert store.get_job("orphan")["owner"] == "new"
+    # Claimed once: the new owner is not stale, and the job is not handed out again
+    store.heartbeat("new")
+    assert store.claim_orphaned_jobs("other", stale_after=60) == []
+
+
+def test_claim_orphaned_jobs_takes_over_from_stale_worker(store):
+    store.heartbeat("stale")
+    store.create_job("job", "a.pdf", status="processing", owner="stale")
+    time.sleep(0.05)
+    claimed = store.claim_orphaned_jobs("new", stale_after=0.01)
+    assert [job["id"] for job in claimed] == ["job"]
@@ -0,0 +1,81 @@
+from openpyxl import load_workbook
+
+from src.excel_convertor.payment_terms_to_excel import render_payment_terms_sheet
+from src.excel_convertor.sheet_writer import save_single_sheet
+from src.markdown_parser import Heading, ListBlock, Paragraph, Table, is_title_line, parse_markdown, split_cells
+
+
+PAYMENT_TERMS = """Payment Terms (Extracted from RFP)
+1. Payment Schedule / Milestones
+- 90% on delivery
+- Balance 10% on submission of Performance Bank Guarantee of equal value
+- Invoices payable within 30 days
+
+2. Advance Payment
+No advance payment.
+
+**4. Penalties / Deductions**
+- 0.5% per week of delay
+
+5. Other Payment-Linked Conditions
+- Payments through RTGS only
+
+Performance Bank Guarantee
+- 3% of contract value
+"""
+
+
+def test_split_cells_handles_escaped_pipes_and_line_breaks():
+    assert split_cells("| a \\| b | c<br>d |") == ["a | b", "c\nd"]
+
+
+def test_ragged_rows_are_padded_or_folded_into_last_column():
+    document = parse_markdown("| A | B | C |\n|---|---|---|\n| 1 |\n| 1 | 2 | 3 | 4 |")
+    table = document.tables[0]
+    assert table.rows == [["1", "", ""], ["1", "2", "3 | 4"]]
+
+
+def test_blocks_are_typed():
+    document = parse_markdown("# Title\n\nSome text\n\n- one\n- two\n\n| A |\n|---|\n| 1 |")
+    assert [type(block) for block in document.blocks] == [Heading, Paragraph, ListBlock, Table]
+    assert document.heading(1) == "Title"
+    assert document.blocks[2].items == ["one", "two"]
+
+
+def test_lone_pipe_line_is_text():
+    document = parse_markdown("| not a table |")
+    assert document.tables == []
+
+
+def test_title_line_matching():
+    assert is_title_line("**1. Payment Schedule / Milestones**", "1. Payment Schedule / Milestones")
+    assert is_title_line("### 2. Advance Payment:", "Advance Payment")
+    assert not is_title_line("- Balance on submission of Performance Bank Guarantee", "Performance Bank Guarantee")
+    assert not is_title_line("3. Advance Payment", "2. Advance Payment")
+
+
+def test_split_at_keeps_body_lines_mentioning_a_title():
+    sections = parse_markdown(PAYMENT_TERMS).split_at(
+        ["1. Payment Schedule / Milestones", "2. Advance Payment", "4. Penalties / Deductions",
+         "5. Other Payment-Linked Conditions"]
+    )
+    assert [section.title for section in sections] == [
+        "1. Payment Schedule / Milestones", "2. Advance Payment", "4. Penalties / Deductions",
+        "5. Other Payment-Linked Conditions"
+    ]
+    assert sections[0].lines() == [
+        "- 90% on delivery",
+        "- Balance 10% on submission of Performance Bank Guarantee of equal value",
+        "- Invoices payable within 30 days"
+    ]
+
+
+def test_payment_terms_sheet_keeps_guarantee_mentions(tmp_path):
+    path = tmp_path / "payment.xlsx"
+    save_single_sheet(render_payment_terms_sheet, parse_markdown(PAYMENT_TERMS), str(path), "Payment Terms")
+    values = [row[0] for row in load_workbook(path).active.iter_rows(values_only=True) if row[0]]
+    assert "- Balance 10% on submission of Performance Bank Guarantee of equal value" in values
+    assert "- Invoices payable within 30 days" in values
+    # The last section still stops at the standalone guarantee title
+    assert "- Payments through RTGS only" in values
+    assert "- 3% of contract value" not in values
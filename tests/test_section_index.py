@@ -0,0 +1,60 @@
+from src.llm_extractor.chunking import estimate_tokens
+from src.pipeline.section_index import DOCUMENT_MARKER, TOPIC_QUERIES, SectionIndex, merge_documents, route_context
+
+FILLER = "general conditions of contract apply to this clause. " * 30
+
+TENDER = f"""# Notice Inviting Tender
+Tender for supply of pumps.
+
+## General Conditions
+{FILLER}
+
+## Payment Terms
+Advance payment of 10% against bank guarantee; balance on delivery milestones.
+
+## Bill of Quantities
+| Item | Qty | Unit rate |
+|---|---|---|
+| Pump | 4 | |
+
+## Arbitration
+{FILLER}
+"""
+
+
+def test_small_document_is_routed_whole():
+    index = SectionIndex(TENDER)
+    assert index.select(TOPIC_QUERIES["payment"], token_budget=index.total_tokens) == TENDER
+
+
+def test_select_keeps_leading_section_and_best_matches_within_budget():
+    index = SectionIndex(TENDER)
+    context = index.select(TOPIC_QUERIES["payment"], token_budget=120)
+    assert estimate_tokens(context) <= 120
+    assert context.startswith("# Notice Inviting Tender")
+    assert "Advance payment of 10%" in context
+    assert "general conditions" not in context
+
+
+def test_sections_remember_their_document_and_markers_are_repeated():
+    merged = merge_documents([("volume1.pdf", TENDER), ("corrigendum.pdf", "## Payment Terms\nRetention of 5%.")])
+    index = SectionIndex(merged)
+    assert {section.document for section in index.sections} == {"volume1.pdf", "corrigendum.pdf"}
+
+    context = index.select(TOPIC_QUERIES["payment"], token_budget=120)
+    assert context.startswith(DOCUMENT_MARKER.format("volume1.pdf"))
+    assert context.index("Advance payment") < context.index(DOCUMENT_MARKER.format("corrigendum.pdf"))
+    assert context.endswith("Retention of 5%.")
+
+
+def test_oversized_section_is_split_without_breaking_tables():
+    rows = "\n".join(f"| Item {index} | {index} |" for index in range(200))
+    index = SectionIndex(f"## Bill of Quantities\n| Item | Qty |\n|---|---|\n{rows}", max_section_tokens=200)
+    assert len(index.sections) > 1
+    assert all(section.tokens <= 200 for section in index.sections)
+    assert all("| Item | Qty |\n|---|---|" in section.text for section in index.sections)
+
+
+def test_routing_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("CONTEXT_ROUTING_ENABLED", "false")
+    assert route_context(TENDER) == {topic: TENDER for topic in TOPIC_QUERIES}
@@ -0,0 +1,63 @@
+import pytest
+from openpyxl import load_workbook
+
+from src.excel_convertor.sheet_writer import save_stacked_workbook, save_workbook
+
+
+def render_items(writer, items):
+    writer.set_widths({1: 30, 2: 12})
+    writer.title_row("Bill of Quantities", 2)
+    writer.header_row(["Item", "Qty"])
+    for item in items:
+        writer.data_row(item)
+
+
+def render_broken(writer, document):
+    writer.title_row("Broken", 2)
+    raise ValueError("bad table")
+
+
+def test_rows_merges_and_styles_are_written(tmp_path):
+    path = tmp_path / "report.xlsx"
+    save_workbook([("BOQ", render_items, [["Pump", 4], ["Valve", 2]])], str(path))
+    ws = load_workbook(path)["BOQ"]
+    assert [list(row) for row in ws.iter_rows(values_only=True)] == [
+        ["Bill of Quantities", None], ["Item", "Qty"], ["Pump", 4], ["Valve", 2]
+    ]
+    assert [str(merged) for merged in ws.merged_cells.ranges] == ["A1:B1"]
+    assert ws["A1"].style == "rfp_title"
+    assert ws.column_dimensions["A"].width == 30
+
+
+def test_failed_render_drops_only_its_sheet(tmp_path):
+    path = tmp_path / "report.xlsx"
+    save_workbook([("Broken", render_broken, None), ("BOQ", render_items, [["Pump", 4]])], str(path))
+    assert load_workbook(path).sheetnames == ["BOQ"]
+
+
+def test_widths_after_first_row_are_refused(tmp_path):
+    def render(writer, document):
+        writer.data_row(["late"])
+        with pytest.raises(RuntimeError):
+            writer.set_widths({1: 10})
+
+    save_workbook([("Sheet", render, None)], str(tmp_path / "report.xlsx"))
+
+
+def test_stacked_sheets_put_each_document_under_its_banner(tmp_path):
+    path = tmp_path / "batch.xlsx"
+    save_stacked_workbook([
+        ("BOQ", render_items, [("volume1.pdf", [["Pump", 4]]), ("volume2.pdf", [["Valve", 2]])]),
+        ("Payment Terms", render_items, []),
+    ], str(path))
+    wb = load_workbook(path)
+    assert wb.sheetnames == ["BOQ"]
+    ws = wb["BOQ"]
+    assert [row[0] for row in ws.iter_rows(values_only=True)] == [
+        "volume1.pdf", "Bill of Quantities", "Item", "Pump", None, None,
+        "volume2.pdf", "Bill of Quantities", "Item", "Valve"
+    ]
+    assert sorted(str(merged) for merged in ws.merged_cells.ranges) == ["A1:F1", "A2:B2", "A7:F7", "A8:B8"]
+    assert ws["A7"].style == "rfp_section_dark"
+    # Widths come from the first document; the second's set_widths is ignored, not an error
+    assert ws.column_dimensions["A"].width == 30
@@ -0,0 +1,48 @@
+import asyncio
+
+from src.events import EventBus, job_context
+from src.pipeline.stages import Stage, jobs_in_flight, stage_workers, stages
+
+
+def test_jobs_queue_in_front_of_busy_workers():
+    async def main():
+        stage = Stage("parse", workers=1)
+        release = asyncio.Event()
+
+        async def job(hold):
+            async with stage.slot():
+                if hold:
+                    await release.wait()
+
+        first = asyncio.create_task(job(hold=True))
+        second = asyncio.create_task(job(hold=False))
+        await asyncio.sleep(0)
+        held = stage.stats()
+        release.set()
+        await asyncio.gather(first, second)
+        return held, stage.stats()
+
+    held, stats = asyncio.run(main())
+    assert held["busy"] == 1 and held["waiting"] == 1
+    assert stats["busy"] == 0 and stats["waiting"] == 0 and stats["completed"] == 2
+
+
+def test_slot_reports_stage_events_for_the_current_job(monkeypatch):
+    bus = EventBus()
+    monkeypatch.setattr("src.events.event_bus", bus)
+
+    async def main():
+        with job_context("job"):
+            async with Stage("extract", workers=2).slot():
+                pass
+
+    asyncio.run(main())
+    assert [record["data"]["state"] for record in bus.history("job")] == ["waiting", "started", "completed"]
+
+
+def test_worker_counts_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("RENDER_CONCURRENCY", "3")
+    monkeypatch.setenv("PARSE_CONCURRENCY", "0")
+    assert stage_workers("render") == 3
+    assert stage_workers("parse") == 1
+    assert jobs_in_flight() == sum(stage.workers for stage in stages.values())